@@ -3,21 +3,27 @@
 # ============================================================
 
 import os
+import json
+import time
 import uuid
 import shutil
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from flask import (
     Flask, request, render_template, redirect, url_for,
-    send_from_directory, flash, jsonify
+    send_from_directory, flash, jsonify, g
 )
 
 # stage 1 parsing
-from stage_1_parsing import process_folder, save_parsed_data
+from stage_1_parsing import process_folder, process_buffers, save_parsed_data, SearchIndex
+from stage_1_parsing.archives import is_archive
 
-# databricks
-from stage_2_databricks.db_utils import (
-    upload_parsed_records, list_tables, preview_table, drop_table
-)
+# databricks (imported on first use so boot doesn't need the connector or a token)
+from stage_2_databricks.cache import TTLCache
+
+def _db():
+    from stage_2_databricks import db_utils
+    return db_utils
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET", "supersecretkey")
@@ -34,6 +40,55 @@ os.makedirs(UPLOAD_ROOT, exist_ok=True)
 os.makedirs(OUTPUTS_DIR, exist_ok=True)
 os.makedirs(IMAGES_ROOT, exist_ok=True)
 
+# uploads up to this many bytes (whole request) are parsed straight from memory;
+# the results are saved and shown through a redirect to /results/<session_id>,
+# so refreshing the page never re-uploads or re-parses
+INMEMORY_UPLOAD_MAX_BYTES = int(os.environ.get("INMEMORY_UPLOAD_MAX_BYTES", str(1024 * 1024)))
+# keep a copy of in-memory uploads for download/preview (written in the background)
+PERSIST_UPLOADS = os.environ.get("PERSIST_UPLOADS", "1") != "0"
+_PERSIST_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="persist-upload")
+
+# full-text index over parsed content (written by a background thread)
+SEARCH_INDEX = SearchIndex(os.path.join(OUTPUTS_DIR, "search_index.sqlite"))
+
+# table list / previews: fresh for DB_CACHE_TTL seconds, then served stale
+# (while refreshing in the background) for up to DB_CACHE_STALE_TTL seconds.
+# Each gunicorn worker has its own cache; invalidations touch a stamp file
+# so the other workers on this host drop theirs on their next read.
+DB_CACHE = TTLCache(
+    ttl=float(os.environ.get("DB_CACHE_TTL", "60")),
+    stale_ttl=float(os.environ.get("DB_CACHE_STALE_TTL", "600")),
+    shared_path=os.environ.get("DB_CACHE_STAMP", os.path.join(OUTPUTS_DIR, "db_cache.stamp")),
+)
+
+
+def _tables_loader():
+    return _db().list_tables()
+
+
+def _preview_loader(table_name):
+    return lambda: _db().preview_table(table_name)
+
+
+def _invalidate_table(table_name):
+    DB_CACHE.invalidate(("preview", table_name))
+    DB_CACHE.invalidate("tables")
+    # warm the list again so the next browser view doesn't wait on the warehouse
+    DB_CACHE.refresh("tables", _tables_loader)
+
+
+# lets API clients (and the load tests) chain /upload into /upload_to_databricks
+# and see how many files failed to parse without scraping the page
+@app.after_request
+def _session_header(response):
+    session_id = g.get("session_id")
+    if session_id:
+        response.headers["X-Session-Id"] = session_id
+    parse_errors = g.get("parse_errors")
+    if parse_errors is not None:
+        response.headers["X-Parse-Errors"] = str(parse_errors)
+    return response
+
 
 # ================================
 # HOME PAGE
@@ -58,15 +113,19 @@ def upload_files():
         return redirect(url_for("index"))
 
     session_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S") + "_" + uuid.uuid4().hex[:8]
+    g.session_id = session_id
+
+    files = [f for f in files if f and f.filename]
+    if _parse_in_memory(files):
+        return _upload_in_memory(files, session_id)
 
     dest_dir = os.path.join(UPLOAD_ROOT, session_id)
     os.makedirs(dest_dir, exist_ok=True)
 
     saved = []
     for f in files:
-        if f and f.filename:
-            f.save(os.path.join(dest_dir, f.filename))
-            saved.append(f.filename)
+        f.save(os.path.join(dest_dir, f.filename))
+        saved.append(f.filename)
 
     if not saved:
         flash("Files could not be saved.", "danger")
@@ -76,11 +135,71 @@ def upload_files():
     return redirect(url_for("parse_results", session_id=session_id))
 
 
+def _parse_in_memory(files):
+    """Small, non-archive uploads skip the save-redirect-reparse round trip."""
+    size = request.content_length
+    return (
+        bool(files)
+        and size is not None
+        and size <= INMEMORY_UPLOAD_MAX_BYTES
+        and not any(is_archive(f.filename) for f in files)
+    )
+
+
+def _persist_upload(dest_dir, buffers):
+    os.makedirs(dest_dir, exist_ok=True)
+    for name, data in buffers:
+        with open(os.path.join(dest_dir, name), "wb") as fh:
+            fh.write(data)
+
+
+def _upload_in_memory(files, session_id):
+    buffers = [(f.filename, f.read()) for f in files]
+
+    try:
+        parsed_df = process_buffers(
+            buffers, session_id,
+            on_result=lambda rec: SEARCH_INDEX.add(session_id, rec)
+        )
+    except Exception as e:
+        return render_template("error.html", error=f"Parsing failed: {e}"), 500
+
+    if PERSIST_UPLOADS:
+        _PERSIST_POOL.submit(_persist_upload, os.path.join(UPLOAD_ROOT, session_id), buffers)
+
+    _save_output(session_id, parsed_df)
+    with open(_results_path(session_id), "w", encoding="utf-8") as fh:
+        json.dump({
+            "records": _build_records(parsed_df),
+            "uploaded_files": [name for name, _ in buffers],
+        }, fh)
+
+    return redirect(url_for("show_results", session_id=session_id))
+
+
+def _results_path(session_id):
+    return os.path.join(OUTPUTS_DIR, f"results_{session_id}.json")
+
+
+@app.route("/results/<session_id>")
+def show_results(session_id):
+    g.session_id = session_id
+    try:
+        with open(_results_path(session_id), "r", encoding="utf-8") as fh:
+            saved = json.load(fh)
+    except FileNotFoundError:
+        flash("Session not found.", "danger")
+        return redirect(url_for("index"))
+
+    return _render_results(session_id, saved["records"], saved["uploaded_files"])
+
+
 # ================================
 # PARSE RESULTS
 # ================================
 @app.route("/parse/<session_id>")
 def parse_results(session_id):
+    g.session_id = session_id
     upload_folder = os.path.join(UPLOAD_ROOT, session_id)
 
     if not os.path.isdir(upload_folder):
@@ -89,33 +208,57 @@ def parse_results(session_id):
 
     # run parser
     try:
-        parsed_df = process_folder(upload_folder, session_id)
+        parsed_df = process_folder(
+            upload_folder, session_id,
+            on_result=lambda rec: SEARCH_INDEX.add(session_id, rec)
+        )
     except Exception as e:
-        return render_template("error.html", error=f"Parsing failed: {e}")
+        return render_template("error.html", error=f"Parsing failed: {e}"), 500
+
+    _save_output(session_id, parsed_df)
+    return _render_results(session_id, _build_records(parsed_df), os.listdir(upload_folder))
+
 
+def _output_name(session_id):
+    return f"parsed_output_{session_id}.txt"
+
+
+def _save_output(session_id, parsed_df):
     # save parsed text output
-    output_name = f"parsed_output_{session_id}.txt"
+    output_name = _output_name(session_id)
     output_path = os.path.join(OUTPUTS_DIR, output_name)
 
     try:
-        save_parsed_data(parsed_df, output_name)
+        save_parsed_data(parsed_df, output_name, output_dir=OUTPUTS_DIR)
     except:
         with open(output_path, "w", encoding="utf-8") as f:
             f.write("")
 
-    # build parsed records
+
+def _build_records(parsed_df):
     records = []
     for _, row in parsed_df.iterrows():
         txt = str(row.get("content", ""))
         snippet = txt[:1000] + "..." if len(txt) > 1000 else txt
 
+        error = row.get("error")
         records.append({
             "file_name": row["file_name"],
             "file_type": row["file_type"],
             "content": txt,
             "snippet": snippet,
-            "images": row.get("images", [])
+            "images": list(row.get("images", [])),
+            "error": error if isinstance(error, str) and error else None
         })
+    return records
+
+
+def _render_results(session_id, records, uploaded_files):
+    g.parse_errors = sum(1 for r in records if r.get("error"))
+
+    # originals of in-memory uploads are written in the background, or not at all
+    upload_folder = os.path.join(UPLOAD_ROOT, session_id)
+    uploads_available = [f for f in uploaded_files if os.path.isfile(os.path.join(upload_folder, f))]
 
     # categorize images
     images_by_type = {"pdf": [], "word": [], "excel": []}
@@ -141,18 +284,39 @@ def parse_results(session_id):
                 "path": img_path
             })
 
-    uploaded_files = os.listdir(upload_folder)
-
     return render_template(
         "results.html",
         session_id=session_id,
         parsed_records=records,
         uploaded_files=uploaded_files,
-        output_file=output_name,
+        uploads_available=uploads_available,
+        persist_uploads=PERSIST_UPLOADS,
+        output_file=_output_name(session_id),
         images_by_type=images_by_type
     )
 
 
+# ================================
+# FULL-TEXT SEARCH
+# ================================
+@app.route("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "q required"}), 400
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 100))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    start = time.perf_counter()
+    hits = SEARCH_INDEX.search(query, session_id=request.args.get("session_id"), limit=limit)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    return jsonify({"query": query, "took_ms": round(took_ms, 2), "hits": hits})
+
+
 # ================================
 # DOWNLOAD PARSED OUTPUT
 # ================================
@@ -219,11 +383,19 @@ def upload_to_databricks():
         content = f.read()
 
     try:
-        upload_parsed_records(
+        # scope ids to the parse session so other sessions' rows are never overwritten
+        summary = _db().upload_parsed_records(
             [{"file_name": output_filename, "file_type": ".txt", "content": content}],
-            table_name=table
+            table_name=table,
+            namespace=data.get("session_id") or output_filename,
         )
-        return jsonify({"message": f"Uploaded to Databricks table '{table}'"})
+        _invalidate_table(table)
+        return jsonify({
+            "message": f"Uploaded to Databricks table '{table}'",
+            "inserted": summary["inserted"],
+            "updated": summary["updated"],
+            "skipped": summary["skipped"],
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -234,7 +406,7 @@ def upload_to_databricks():
 @app.route("/db/tables")
 def db_tables():
     try:
-        return render_template("db_tables.html", tables=list_tables())
+        return render_template("db_tables.html", tables=DB_CACHE.get("tables", _tables_loader))
     except Exception as e:
         return render_template("error.html", error=str(e))
 
@@ -242,7 +414,7 @@ def db_tables():
 @app.route("/db/table/<table_name>")
 def db_table_preview(table_name):
     try:
-        cols, rows = preview_table(table_name)
+        cols, rows = DB_CACHE.get(("preview", table_name), _preview_loader(table_name))
         return render_template("db_table_preview.html", table_name=table_name, columns=cols, rows=rows)
     except Exception as e:
         return render_template("error.html", error=str(e))
@@ -251,7 +423,8 @@ def db_table_preview(table_name):
 @app.route("/db/table/<table_name>/delete", methods=["POST"])
 def db_table_delete(table_name):
     try:
-        drop_table(table_name)
+        _db().drop_table(table_name)
+        _invalidate_table(table_name)
         flash("Table deleted", "success")
         return redirect(url_for("db_tables"))
     except Exception as e:
@@ -0,0 +1,59 @@
+# benchmarks/benchmark_bulk_upload.py
+"""
+Compare the batched VALUES MERGE path with the staged Parquet bulk path
+against benchmarks/fake_databricks.py, including an idempotent re-run.
+The fake charges a flat latency per statement, so timings show client-side
+cost (Parquet staging, statement building), not warehouse throughput.
+Run from repo root: python benchmarks/benchmark_bulk_upload.py [records]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_databricks import install
+
+install()
+
+from stage_2_databricks import db_utils  # noqa: E402
+
+VOLUME = "/Volumes/main/default/staging"
+
+
+def make_records(n):
+    return [
+        {"file_name": f"doc_{i:06d}.pdf", "file_type": ".pdf", "content": f"page text {i} " * 50}
+        for i in range(n)
+    ]
+
+
+def timed(label, records, table, volume):
+    db_utils.DATABRICKS_STAGING_VOLUME = volume
+    start = time.time()
+    summary = db_utils.upload_parsed_records(records, table_name=table)
+    elapsed = time.time() - start
+    print(
+        f"{label}: {elapsed:.2f}s ({len(records) / elapsed:.0f} rows/s) "
+        f"inserted={summary['inserted']} updated={summary['updated']} skipped={summary['skipped']}"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    records = make_records(n)
+    db_utils.BULK_LOAD_THRESHOLD = min(db_utils.BULK_LOAD_THRESHOLD, n)
+
+    for label, table, volume in (("batched", "bench_batched", None), ("bulk", "bench_bulk", VOLUME)):
+        first = timed(f"{label} load", records, table, volume)
+        again = timed(f"{label} re-run", records, table, volume)
+        assert first["inserted"] == n and again["skipped"] == n, "upsert is not idempotent"
+        db_utils.drop_table(table)
+
+    # bulk_upload_parsed_records refuses to point the warehouse at local files
+    db_utils.DATABRICKS_STAGING_VOLUME = None
+    try:
+        db_utils.bulk_upload_parsed_records(records[:1], table_name="bench_bulk")
+    except EnvironmentError as e:
+        print(f"bulk without volume: {e}")
@@ -0,0 +1,36 @@
+# benchmarks/benchmark_startup.py
+"""
+Measure cold import time of the app and parsing package in fresh interpreters.
+Run from repo root: python benchmarks/benchmark_startup.py [runs]
+"""
+import sys
+import time
+import subprocess
+
+TARGETS = {
+    "stage_1_parsing": "import stage_1_parsing",
+    "stage_2_databricks": "import stage_2_databricks",
+    "app": "import app",
+}
+
+def time_import(stmt, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.time()
+        proc = subprocess.run([sys.executable, "-c", stmt], capture_output=True, text=True)
+        elapsed = time.time() - start
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1]
+        best = elapsed if best is None else min(best, elapsed)
+    return best, None
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline, _ = time_import("pass", runs)
+    print(f"interpreter baseline: {baseline:.3f}s")
+    for name, stmt in TARGETS.items():
+        elapsed, err = time_import(stmt, runs)
+        if err:
+            print(f"{name}: failed ({err})")
+        else:
+            print(f"{name}: {elapsed:.3f}s (+{elapsed - baseline:.3f}s)")
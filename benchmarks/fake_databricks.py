@@ -0,0 +1,233 @@
+# benchmarks/fake_databricks.py
+"""
+In-process stand-in for `databricks.sql` used by the load tests.
+
+install() registers fake `databricks` / `databricks.sql` modules and a dummy
+DATABRICKS_TOKEN, so stage_2_databricks.db_utils runs unchanged against an
+in-memory store. Warehouse latency is simulated with
+FAKE_DATABRICKS_CONNECT_MS (per connection) and FAKE_DATABRICKS_QUERY_MS
+(per statement).
+
+Like a remote warehouse, it only reads files under /Volumes: PUT copies
+local files into a volume directory (FAKE_DATABRICKS_VOLUME_ROOT), and
+statements reading any other path fail.
+"""
+
+import os
+import re
+import sys
+import time
+import types
+import shutil
+import tempfile
+import threading
+
+CATALOG = "main"
+SCHEMA = "default"
+
+CONNECT_MS = float(os.getenv("FAKE_DATABRICKS_CONNECT_MS", "50"))
+QUERY_MS = float(os.getenv("FAKE_DATABRICKS_QUERY_MS", "20"))
+VOLUME_ROOT = os.getenv("FAKE_DATABRICKS_VOLUME_ROOT") or os.path.join(
+    tempfile.gettempdir(), "fake_databricks_volumes"
+)
+
+_MERGE_STATS = [
+    ("num_affected_rows",), ("num_updated_rows",), ("num_deleted_rows",), ("num_inserted_rows",),
+]
+
+
+class _Table:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows = []
+
+
+class _Store:
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+
+
+_STORE = _Store()
+
+
+def _short_name(name):
+    return name.strip("` ").split(".")[-1].lower()
+
+
+def _columns(defs):
+    return [d.split()[0].lower() for d in defs.split(",") if d.strip()]
+
+
+def _volume_path(path):
+    """Local directory backing a /Volumes/... path; anything else isn't visible."""
+    path = path.replace("''", "'")
+    if not path.startswith("/Volumes/"):
+        raise RuntimeError(f"[PATH_NOT_FOUND] {path} is not readable by the warehouse")
+    return os.path.join(VOLUME_ROOT, path.lstrip("/"))
+
+
+class Cursor:
+    def __init__(self, staging_allowed_local_path=None):
+        self.staging_allowed_local_path = staging_allowed_local_path
+        self.description = None
+        self._rows = []
+
+    # ---------------- DB-API ----------------
+    def execute(self, operation, parameters=None):
+        time.sleep(QUERY_MS / 1000)
+        sql = " ".join(operation.split())
+        self.description, self._rows = None, []
+        with _STORE.lock:
+            self._dispatch(sql, list(parameters or []))
+        return self
+
+    def executemany(self, operation, seq_of_parameters):
+        for params in seq_of_parameters:
+            self.execute(operation, params)
+        return self
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    # ---------------- statements ----------------
+    def _result(self, columns, rows):
+        self.description = [(c, "string", None, None, None, None, None) for c in columns]
+        self._rows = rows
+
+    def _dispatch(self, sql, params):
+        upper = sql.upper()
+
+        if upper.startswith("SELECT CURRENT_CATALOG()"):
+            return self._result(["current_catalog()", "current_schema()"], [(CATALOG, SCHEMA)])
+
+        m = re.match(r"CREATE TABLE IF NOT EXISTS (\S+) \((.*)\)$", sql, re.I)
+        if m:
+            _STORE.tables.setdefault(_short_name(m.group(1)), _Table(_columns(m.group(2))))
+            return
+
+        m = re.match(r"ALTER TABLE (\S+) ADD COLUMNS \((.*)\)$", sql, re.I)
+        if m:
+            table = self._table(m.group(1))
+            for col in _columns(m.group(2)):
+                if col not in table.columns:
+                    table.columns.append(col)
+                    for row in table.rows:
+                        row[col] = None
+            return
+
+        m = re.match(r"SELECT \* FROM (\S+) LIMIT (\d+)$", sql, re.I)
+        if m:
+            table = self._table(m.group(1))
+            rows = [tuple(r.get(c) for c in table.columns) for r in table.rows[:int(m.group(2))]]
+            return self._result(table.columns, rows)
+
+        m = re.match(r"SHOW TABLES IN (\S+)$", sql, re.I)
+        if m:
+            rows = [(SCHEMA, name, False) for name in sorted(_STORE.tables)]
+            return self._result(["database", "tableName", "isTemporary"], rows)
+
+        m = re.match(r"DROP TABLE IF EXISTS (\S+)$", sql, re.I)
+        if m:
+            _STORE.tables.pop(_short_name(m.group(1)), None)
+            return
+
+        m = re.match(r"INSERT INTO (\S+) \((.*?)\) VALUES", sql, re.I)
+        if m:
+            table = self._table(m.group(1))
+            table.rows.append(dict(zip(_columns(m.group(2)), params)))
+            return
+
+        m = re.match(r"MERGE INTO (\S+) AS t USING \((.*)\) AS s ON", sql, re.I)
+        if m:
+            return self._merge(self._table(m.group(1)), m.group(2), params)
+
+        m = re.match(r"PUT '((?:[^']|'')*)' INTO '((?:[^']|'')*)'", sql, re.I)
+        if m:
+            local = os.path.abspath(m.group(1).replace("''", "'"))
+            allowed = self.staging_allowed_local_path
+            # the real connector refuses PUT outside staging_allowed_local_path
+            if not allowed or os.path.commonpath([local, os.path.abspath(allowed)]) != os.path.abspath(allowed):
+                raise RuntimeError(f"Local file operations are restricted to {allowed}")
+            target = _volume_path(m.group(2))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(local, target)
+            return
+
+        m = re.match(r"REMOVE '((?:[^']|'')*)'", sql, re.I)
+        if m:
+            target = _volume_path(m.group(1))
+            if os.path.exists(target):
+                os.remove(target)
+                # drop the per-batch directory once it is empty
+                try:
+                    os.rmdir(os.path.dirname(target))
+                except OSError:
+                    pass
+            return
+
+        raise RuntimeError(f"fake databricks: unsupported statement: {sql[:80]}")
+
+    def _table(self, name):
+        table = _STORE.tables.get(_short_name(name))
+        if table is None:
+            raise RuntimeError(f"[TABLE_OR_VIEW_NOT_FOUND] {name}")
+        return table
+
+    def _merge(self, table, source_sql, params):
+        m = re.search(r"AS v\((.*?)\)", source_sql)
+        if m:
+            cols = _columns(m.group(1))
+            width = len(cols)
+            source = [dict(zip(cols, params[i:i + width])) for i in range(0, len(params), width)]
+        else:
+            m = re.search(r"parquet\.`(.*?)`", source_sql)
+            import pandas as pd
+            source = pd.read_parquet(_volume_path(m.group(1))).to_dict("records")
+
+        by_id = {r.get("doc_id"): r for r in table.rows if r.get("doc_id") is not None}
+        inserted = updated = 0
+        for src in source:
+            row = by_id.get(src["doc_id"])
+            if row is None:
+                new_row = {c: src.get(c) for c in table.columns}
+                table.rows.append(new_row)
+                by_id[src["doc_id"]] = new_row
+                inserted += 1
+            elif row.get("content_hash") != src["content_hash"]:
+                row.update({c: src.get(c) for c in table.columns})
+                updated += 1
+        self._result([c[0] for c in _MERGE_STATS], [(inserted + updated, updated, 0, inserted)])
+
+
+class Connection:
+    def __init__(self, staging_allowed_local_path=None, **kwargs):
+        self.staging_allowed_local_path = staging_allowed_local_path
+        time.sleep(CONNECT_MS / 1000)
+
+    def cursor(self):
+        return Cursor(self.staging_allowed_local_path)
+
+    def close(self):
+        pass
+
+
+def connect(**kwargs):
+    return Connection(**kwargs)
+
+
+def install():
+    """Register the fake connector as `databricks.sql`."""
+    pkg = types.ModuleType("databricks")
+    sql = types.ModuleType("databricks.sql")
+    sql.connect = connect
+    pkg.sql = sql
+    sys.modules["databricks"] = pkg
+    sys.modules["databricks.sql"] = sql
+    os.environ.setdefault("DATABRICKS_TOKEN", "fake-token")
+    os.environ.setdefault("DATABRICKS_SERVER", "fake.cloud.databricks.com")
+    os.environ.setdefault("DATABRICKS_HTTP_PATH", "/sql/1.0/warehouses/fake")
@@ -0,0 +1,447 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test: /upload -> /parse/<session_id> (or /results/<session_id>
+for in-memory uploads) -> /upload_to_databricks.
+
+Boots the Flask app against benchmarks/fake_databricks.py (gunicorn workers,
+or an in-process threaded server) and drives concurrent sessions with a
+weighted file mix. Reports throughput, p50/p95/p99 latency per step, error
+rates and per-worker CPU / peak RSS. Files that fail to parse (reported by
+the app in X-Parse-Errors) count as errors of the step that parsed them.
+
+Run from repo root:
+    python benchmarks/load_test.py --workers 4 --concurrency 8 --sessions 200 \\
+        --mix files/PDF/sample_1.pdf=3,files/Word/sample_1.docx=2,files/Excel/sample_2.xlsx=1
+
+    # against a server that is already running (no worker stats)
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --sessions 50
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_MIX = (
+    "files/PDF/sample_1.pdf=1,files/Word/sample_1.docx=1,files/Word/sample_2.doc=1,"
+    "files/Excel/sample_1.xls=1,files/Excel/sample_2.xlsx=1"
+)
+STEPS = ("upload", "parse", "databricks", "session")
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+# --------------------------------------------------------------------
+# HTTP
+# --------------------------------------------------------------------
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_OPENER = urllib.request.build_opener(_NoRedirect)
+
+
+def _request(url, data=None, headers=None, method=None, timeout=300):
+    """(status, headers, body); HTTP errors are returned, not raised."""
+    req = urllib.request.Request(url, data=data, headers=headers or {}, method=method)
+    try:
+        with _OPENER.open(req, timeout=timeout) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def _multipart(files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, data in files:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="files"; '
+            f'filename="{name}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode()
+        )
+        parts.append(data)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+# --------------------------------------------------------------------
+# File mix
+# --------------------------------------------------------------------
+def parse_mix(spec):
+    """'path=weight,...' -> [(basename, bytes)], [weight]."""
+    files, weights = [], []
+    for item in spec.split(","):
+        path, _, weight = item.strip().partition("=")
+        full = path if os.path.isabs(path) else os.path.join(ROOT, path)
+        with open(full, "rb") as fh:
+            files.append((os.path.basename(path), fh.read()))
+        weights.append(float(weight or 1))
+    return files, weights
+
+
+# --------------------------------------------------------------------
+# One session
+# --------------------------------------------------------------------
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.failed_files = 0
+
+    def ok(self, step, elapsed):
+        with self.lock:
+            self.latency[step].append(elapsed)
+
+    def fail(self, step, reason, failed_files=0):
+        with self.lock:
+            self.errors[step][reason] += 1
+            self.failed_files += failed_files
+
+
+def run_session(base_url, files, table_name, stats, skip_databricks=False):
+    body, content_type = _multipart(files)
+    session_start = time.perf_counter()
+
+    def step(name, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            status, headers, data = _request(*args, **kwargs)
+        except Exception as e:
+            stats.fail(name, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - start
+        if status >= 400:
+            stats.fail(name, f"HTTP {status}")
+            return None
+        parse_errors = int(headers.get("X-Parse-Errors") or 0)
+        if parse_errors:
+            stats.fail(name, "files failed to parse", parse_errors)
+            return None
+        stats.ok(name, elapsed)
+        return status, headers, data
+
+    res = step("upload", base_url + "/upload", data=body,
+               headers={"Content-Type": content_type}, method="POST")
+    if res is None:
+        return
+    status, headers, _ = res
+    session_id = headers.get("X-Session-Id")
+    if not session_id:
+        stats.fail("upload", "no session id")
+        return
+
+    # large uploads redirect to /parse/<id> (parsed there), small ones are
+    # parsed during the upload and redirect to the saved /results/<id> page
+    if status in (301, 302, 303, 307):
+        location = urllib.parse.urljoin(base_url + "/", headers.get("Location", ""))
+        if step("parse", location) is None:
+            return
+
+    if not skip_databricks:
+        payload = json.dumps({
+            "table_name": table_name,
+            "output_file": f"parsed_output_{session_id}.txt",
+            "session_id": session_id,
+        }).encode()
+        if step("databricks", base_url + "/upload_to_databricks", data=payload,
+                headers={"Content-Type": "application/json"}, method="POST") is None:
+            return
+
+    stats.ok("session", time.perf_counter() - session_start)
+
+
+# --------------------------------------------------------------------
+# Worker resource sampling (Linux /proc)
+# --------------------------------------------------------------------
+def _children(pid):
+    kids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                fields = fh.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            kids.append(int(entry))
+    return kids
+
+
+def _cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    # utime/stime plus reaped children (parse pool processes)
+    ticks = sum(int(fields[i]) for i in (11, 12, 13, 14))
+    return ticks / CLK_TCK
+
+
+def _rss_bytes(pid):
+    total = 0
+    for p in [pid] + _children(pid):
+        try:
+            with open(f"/proc/{p}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    return total
+
+
+class WorkerSampler(threading.Thread):
+    """Samples CPU time and RSS (incl. each worker's own children) every interval."""
+
+    def __init__(self, pids_fn, interval=0.5):
+        super().__init__(daemon=True)
+        self.pids_fn = pids_fn
+        self.interval = interval
+        self.start_cpu = {}
+        self.last_cpu = {}
+        self.peak_rss = defaultdict(int)
+        self.stopped = threading.Event()
+
+    def sample(self):
+        for pid in self.pids_fn():
+            try:
+                cpu = _cpu_seconds(pid) + sum(_safe_cpu(c) for c in _children(pid))
+                rss = _rss_bytes(pid)
+            except OSError:
+                continue
+            self.start_cpu.setdefault(pid, cpu)
+            self.last_cpu[pid] = cpu
+            self.peak_rss[pid] = max(self.peak_rss[pid], rss)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+    def report(self, elapsed):
+        rows = []
+        for pid in sorted(self.last_cpu):
+            cpu = self.last_cpu[pid] - self.start_cpu[pid]
+            rows.append({
+                "pid": pid,
+                "cpu_s": round(cpu, 2),
+                "cpu_pct": round(100 * cpu / elapsed, 1) if elapsed else 0.0,
+                "peak_rss_mb": round(self.peak_rss[pid] / 1024 ** 2, 1),
+            })
+        return rows
+
+
+def _safe_cpu(pid):
+    try:
+        return _cpu_seconds(pid)
+    except OSError:
+        return 0.0
+
+
+# --------------------------------------------------------------------
+# Server boot
+# --------------------------------------------------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url, proc=None, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            _request(base_url + "/search", timeout=2)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not come up within {timeout}s")
+
+
+def boot_gunicorn(port, workers, env):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "benchmarks.loadtest_app:app",
+         "-w", str(workers), "-b", f"127.0.0.1:{port}", "--timeout", "300",
+         "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    return proc, lambda: _children(proc.pid)
+
+
+def boot_inprocess(port):
+    from werkzeug.serving import make_server
+    from benchmarks.loadtest_app import app
+
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, lambda: [os.getpid()]
+
+
+# --------------------------------------------------------------------
+# Report
+# --------------------------------------------------------------------
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def build_report(stats, elapsed, sessions, workers):
+    steps = {}
+    for name in STEPS:
+        lat = stats.latency.get(name, [])
+        errors = dict(stats.errors.get(name, {}))
+        attempts = len(lat) + sum(errors.values())
+        if not attempts:
+            continue
+        steps[name] = {
+            "ok": len(lat),
+            "errors": errors,
+            "error_rate": round(sum(errors.values()) / attempts, 4),
+            **{
+                f"p{p}_ms": None if not lat else round(_percentile(lat, p) * 1000, 1)
+                for p in (50, 95, 99)
+            },
+        }
+    completed = len(stats.latency.get("session", []))
+    return {
+        "sessions": sessions,
+        "completed": completed,
+        "session_error_rate": round(1 - completed / sessions, 4) if sessions else 0.0,
+        "failed_files": stats.failed_files,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_sessions_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+        "steps": steps,
+        "workers": workers,
+    }
+
+
+def print_report(report):
+    print(
+        f"\n{report['completed']}/{report['sessions']} sessions in {report['elapsed_s']}s "
+        f"({report['throughput_sessions_per_s']} sessions/s), "
+        f"{100 * report['session_error_rate']:.1f}% failed, "
+        f"{report['failed_files']} files failed to parse"
+    )
+    print(f"{'step':<12}{'ok':>6}{'err%':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, s in report["steps"].items():
+        cols = [s[f"p{p}_ms"] for p in (50, 95, 99)]
+        cols = "".join(f"{'-' if c is None else c:>10}" for c in cols)
+        print(f"{name:<12}{s['ok']:>6}{100 * s['error_rate']:>7.1f}%{cols}")
+        for reason, count in s["errors"].items():
+            print(f"    {reason}: {count}")
+    if report["workers"]:
+        print(f"\n{'worker pid':<12}{'cpu s':>8}{'cpu %':>8}{'peak rss MB':>14}")
+        for w in report["workers"]:
+            print(f"{w['pid']:<12}{w['cpu_s']:>8}{w['cpu_pct']:>8}{w['peak_rss_mb']:>14}")
+
+
+# --------------------------------------------------------------------
+# CLI
+# --------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the upload/parse/Databricks flow.")
+    parser.add_argument("--url", help="target an already running server instead of booting one")
+    parser.add_argument("--server", choices=("gunicorn", "inprocess"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent client sessions")
+    parser.add_argument("--sessions", type=int, default=20, help="total sessions to run")
+    parser.add_argument("--files-per-session", type=int, default=2)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="path=weight,... (paths relative to repo root)")
+    parser.add_argument("--table", default="loadtest_parsed", help="Databricks table name")
+    parser.add_argument("--skip-databricks", action="store_true", help="stop after parsing")
+    parser.add_argument("--disk-uploads", action="store_true",
+                        help="force the save + /parse redirect path (INMEMORY_UPLOAD_MAX_BYTES=0)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    files, weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plans = [rng.choices(files, weights, k=args.files_per_session) for _ in range(args.sessions)]
+
+    env = dict(os.environ)
+    if args.disk_uploads:
+        env["INMEMORY_UPLOAD_MAX_BYTES"] = "0"
+    # keep the booted server's extracted images out of the repo's Outputs/
+    images_root = None
+    if not args.url and "PARSED_IMAGES_ROOT" not in env:
+        images_root = env["PARSED_IMAGES_ROOT"] = tempfile.mkdtemp(prefix="loadtest_images_")
+
+    server, pids_fn = None, None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        if args.server == "gunicorn":
+            server, pids_fn = boot_gunicorn(port, args.workers, env)
+        else:
+            os.environ.update(env)
+            server, pids_fn = boot_inprocess(port)
+        _wait_ready(base_url, server if isinstance(server, subprocess.Popen) else None)
+
+    sampler = None
+    if pids_fn and os.path.isdir("/proc"):
+        sampler = WorkerSampler(pids_fn)
+        sampler.sample()
+        sampler.start()
+
+    stats = Stats()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for plan in plans:
+                # rename per session so every upload is a distinct document
+                tag = uuid.uuid4().hex[:6]
+                named = [(f"{tag}_{i}_{name}", data) for i, (name, data) in enumerate(plan)]
+                pool.submit(run_session, base_url, named, args.table, stats, args.skip_databricks)
+        elapsed = time.perf_counter() - start
+    finally:
+        if sampler:
+            sampler.stop()
+        if isinstance(server, subprocess.Popen):
+            server.terminate()
+            server.wait(timeout=30)
+        elif server is not None:
+            server.shutdown()
+        if images_root:
+            shutil.rmtree(images_root, ignore_errors=True)
+
+    report = build_report(stats, elapsed, args.sessions, sampler.report(elapsed) if sampler else [])
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    return 0 if report["completed"] == args.sessions else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
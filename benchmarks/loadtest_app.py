@@ -0,0 +1,16 @@
+# benchmarks/loadtest_app.py
+"""
+WSGI entry point serving app.py against the fake Databricks backend.
+
+    gunicorn -w 4 -b 127.0.0.1:8000 benchmarks.loadtest_app:app
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_databricks import install
+
+install()
+
+from app import app  # noqa: E402
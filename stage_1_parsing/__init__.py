@@ -1,8 +1,12 @@
 # stage_1_parsing/__init__.py
 """
 Optimized Stage 1 parsing package entrypoints.
-Exposes process_folder and save_parsed_data.
+Exposes process_folder, process_buffers, save_parsed_data, the parser
+registry and SearchIndex.
+Parser backends (pymupdf, openpyxl, pandas) load on first use.
 """
-from .process_files import process_folder, save_parsed_data
+from .process_files import process_folder, process_buffers, save_parsed_data
+from .registry import PARSERS, register_parser
+from .search_index import SearchIndex
 
-__all__ = ["process_folder", "save_parsed_data"]
+__all__ = ["process_folder", "process_buffers", "save_parsed_data", "PARSERS", "register_parser", "SearchIndex"]
@@ -0,0 +1,115 @@
+# stage_1_parsing/archives.py
+"""
+Stream members out of zip/tar uploads without extracting them to disk.
+
+Limits guard against archive bombs; override them with the
+MAX_ARCHIVE_MEMBERS, MAX_ARCHIVE_TOTAL_BYTES and MAX_ARCHIVE_RATIO
+environment variables.
+"""
+
+import os
+import tarfile
+import zipfile
+from typing import Callable, Iterator, Tuple
+
+ARCHIVE_EXTENSIONS = (
+    ".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz",
+)
+
+MAX_ARCHIVE_MEMBERS = int(os.getenv("MAX_ARCHIVE_MEMBERS", "10000"))
+MAX_ARCHIVE_TOTAL_BYTES = int(os.getenv("MAX_ARCHIVE_TOTAL_BYTES", str(2 * 1024 ** 3)))
+MAX_ARCHIVE_RATIO = int(os.getenv("MAX_ARCHIVE_RATIO", "100"))
+
+
+class ArchiveLimitError(ValueError):
+    pass
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+class _Budget:
+    def __init__(self, archive_size: int):
+        self.archive_size = max(archive_size, 1)
+        self.members = 0
+        self.total = 0
+
+    def count_member(self) -> None:
+        self.members += 1
+        if self.members > MAX_ARCHIVE_MEMBERS:
+            raise ArchiveLimitError(f"Archive has more than {MAX_ARCHIVE_MEMBERS} members")
+
+    def remaining(self) -> int:
+        return MAX_ARCHIVE_TOTAL_BYTES - self.total
+
+    def check_declared(self, size: int) -> None:
+        """Reject a member from its header size, before any bytes are read."""
+        if size > self.remaining():
+            raise ArchiveLimitError(
+                f"Archive expands beyond {MAX_ARCHIVE_TOTAL_BYTES} bytes"
+            )
+        if (self.total + size) / self.archive_size > MAX_ARCHIVE_RATIO:
+            raise ArchiveLimitError(
+                f"Archive compression ratio exceeds {MAX_ARCHIVE_RATIO}:1"
+            )
+
+    def add_bytes(self, size: int) -> None:
+        self.total += size
+        if self.total > MAX_ARCHIVE_TOTAL_BYTES:
+            raise ArchiveLimitError(
+                f"Archive expands beyond {MAX_ARCHIVE_TOTAL_BYTES} bytes"
+            )
+        if self.total / self.archive_size > MAX_ARCHIVE_RATIO:
+            raise ArchiveLimitError(
+                f"Archive compression ratio exceeds {MAX_ARCHIVE_RATIO}:1"
+            )
+
+
+def _iter_zip(path: str, accept: Callable[[str], bool], budget: _Budget):
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            budget.count_member()
+            if info.is_dir() or not accept(info.filename):
+                continue
+
+            budget.check_declared(info.file_size)
+            if info.compress_size and info.file_size / info.compress_size > MAX_ARCHIVE_RATIO:
+                raise ArchiveLimitError(
+                    f"Member {info.filename} compression ratio exceeds {MAX_ARCHIVE_RATIO}:1"
+                )
+
+            # never trust the declared size: read at most one byte past the budget
+            with zf.open(info) as fh:
+                data = fh.read(budget.remaining() + 1)
+            budget.add_bytes(len(data))
+            yield info.filename, data
+
+
+def _iter_tar(path: str, accept: Callable[[str], bool], budget: _Budget):
+    # "r|*" streams sequentially, so compressed tars are decompressed once
+    with tarfile.open(path, "r|*") as tf:
+        for member in tf:
+            budget.count_member()
+            if not member.isfile() or not accept(member.name):
+                continue
+            budget.check_declared(member.size)
+
+            fh = tf.extractfile(member)
+            if fh is None:
+                continue
+            data = fh.read(budget.remaining() + 1)
+            budget.add_bytes(len(data))
+            yield member.name, data
+
+
+def iter_archive_members(path: str, accept: Callable[[str], bool]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (archive-relative path, bytes) for every accepted regular member.
+    Raises ArchiveLimitError as soon as a limit is exceeded.
+    """
+    budget = _Budget(os.path.getsize(path))
+    if path.lower().endswith(".zip"):
+        yield from _iter_zip(path, accept, budget)
+    else:
+        yield from _iter_tar(path, accept, budget)
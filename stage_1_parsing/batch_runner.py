@@ -0,0 +1,274 @@
+# stage_1_parsing/batch_runner.py
+"""
+Headless, sharded batch parsing for large backfills.
+
+Every node walks the same root, keeps only the files whose path hash
+falls in its shard, and writes its own JSONL output plus a manifest.
+Extracted images go to <out>/images, named after each file's root-relative
+path. Nodes only need a shared filesystem; no coordination is required.
+
+    # on node i of N
+    python -m stage_1_parsing.batch_runner run /data/docs --out /shared/run1 \\
+        --shard-index i --shard-count N
+
+    # once every shard has finished
+    python -m stage_1_parsing.batch_runner merge --out /shared/run1
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+from .archives import is_archive
+from .process_files import _is_parseable, format_record, iter_parsed
+
+PROGRESS_INTERVAL = 5.0
+IMAGES_DIR = "images"
+
+
+# --------------------------------------------------------------------
+# Sharding
+# --------------------------------------------------------------------
+def shard_of(rel_path: str, shard_count: int) -> int:
+    """Deterministic shard for a root-relative path (stable across machines)."""
+    digest = hashlib.sha1(rel_path.replace(os.sep, "/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def iter_input_files(root: str) -> Iterator[str]:
+    """Parseable files and archives under root, in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for fn in sorted(filenames):
+            full = os.path.join(dirpath, fn)
+            if _is_parseable(full) or is_archive(full):
+                yield full
+
+
+def shard_files(root: str, shard_index: int, shard_count: int) -> List[str]:
+    return [
+        f for f in iter_input_files(root)
+        if shard_of(os.path.relpath(f, root), shard_count) == shard_index
+    ]
+
+
+def _shard_prefix(out_dir: str, shard_index: int, shard_count: int) -> str:
+    return os.path.join(out_dir, f"shard-{shard_index:05d}-of-{shard_count:05d}")
+
+
+# --------------------------------------------------------------------
+# Progress
+# --------------------------------------------------------------------
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
+
+
+class _Progress:
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.start = time.time()
+        self.last = 0.0
+        self.sources = set()
+        self.records = 0
+        self.errors = 0
+
+    def update(self, record: Dict) -> None:
+        self.records += 1
+        if record["error"]:
+            self.errors += 1
+        self.sources.add(record.get("source"))
+
+        now = time.time()
+        if now - self.last >= PROGRESS_INTERVAL:
+            self.last = now
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = time.time() - self.start
+        done = len(self.sources)
+        rate = done / elapsed if elapsed else 0.0
+        pct = 100.0 * done / self.total if self.total else 100.0
+        line = (
+            f"[{self.label}] {done}/{self.total} files ({pct:.1f}%), "
+            f"{self.records} records, {self.errors} errors, {rate:.1f} files/s"
+        )
+        if final:
+            line += f", done in {_fmt_duration(elapsed)}"
+        elif rate:
+            line += f", ETA {_fmt_duration((self.total - done) / rate)}"
+        print(line, file=sys.stderr, flush=True)
+
+
+# --------------------------------------------------------------------
+# Run one shard
+# --------------------------------------------------------------------
+def run_shard(
+    root: str,
+    out_dir: str,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    session_id: str = "batch",
+    max_workers: int = None,
+) -> Dict:
+    """
+    Parse this shard's files and write <prefix>.jsonl and <prefix>.manifest.json.
+    Image paths in the JSONL are relative to out_dir.
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError("shard_index must be in [0, shard_count)")
+
+    root = os.path.abspath(root)
+    os.makedirs(out_dir, exist_ok=True)
+    prefix = _shard_prefix(out_dir, shard_index, shard_count)
+
+    files = shard_files(root, shard_index, shard_count)
+    progress = _Progress(f"shard {shard_index + 1}/{shard_count}", len(files))
+    started_at = datetime.utcnow().isoformat()
+
+    # parse workers inherit the environment, so their images land under out_dir
+    previous_images_root = os.environ.get("PARSED_IMAGES_ROOT")
+    os.environ["PARSED_IMAGES_ROOT"] = os.path.join(os.path.abspath(out_dir), IMAGES_DIR)
+
+    # write to a temp name so a crashed shard never looks complete
+    tmp_output = prefix + ".jsonl.part"
+    try:
+        with open(tmp_output, "w", encoding="utf-8") as out:
+            for record in iter_parsed(files, session_id, max_workers=max_workers, root=root):
+                record["source"] = os.path.relpath(record["source"], root)
+                record["images"] = [os.path.relpath(p, out_dir) for p in record["images"]]
+                record.pop("pages", None)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                progress.update(record)
+    finally:
+        if previous_images_root is None:
+            os.environ.pop("PARSED_IMAGES_ROOT", None)
+        else:
+            os.environ["PARSED_IMAGES_ROOT"] = previous_images_root
+    os.replace(tmp_output, prefix + ".jsonl")
+    progress.report(final=True)
+
+    manifest = {
+        "root": root,
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "session_id": session_id,
+        "files": len(files),
+        "records": progress.records,
+        "errors": progress.errors,
+        "started_at": started_at,
+        "finished_at": datetime.utcnow().isoformat(),
+        "elapsed_s": round(time.time() - progress.start, 3),
+        "output": os.path.basename(prefix + ".jsonl"),
+        "images": IMAGES_DIR,
+    }
+    with open(prefix + ".manifest.json", "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    return manifest
+
+
+# --------------------------------------------------------------------
+# Merge shards
+# --------------------------------------------------------------------
+def merge_shards(out_dir: str, output_file: str = "parsed_output.txt") -> Dict:
+    """
+    Concatenate finished shard outputs into merged.jsonl + a text output
+    (same format as save_parsed_data) and a merged manifest.
+    """
+    manifests = []
+    for path in sorted(glob.glob(os.path.join(out_dir, "shard-*.manifest.json"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            manifests.append(json.load(fh))
+    if not manifests:
+        raise FileNotFoundError(f"No shard manifests in {out_dir}")
+
+    shard_count = manifests[0]["shard_count"]
+    if any(m["shard_count"] != shard_count for m in manifests):
+        raise ValueError("Shard manifests disagree on shard_count")
+    present = {m["shard_index"] for m in manifests}
+    missing = sorted(set(range(shard_count)) - present)
+
+    merged_jsonl = os.path.join(out_dir, "merged.jsonl")
+    merged_text = os.path.join(out_dir, output_file)
+    with open(merged_jsonl, "w", encoding="utf-8") as out_json, \
+            open(merged_text, "w", encoding="utf-8") as out_text:
+        for m in sorted(manifests, key=lambda m: m["shard_index"]):
+            with open(os.path.join(out_dir, m["output"]), "r", encoding="utf-8") as fh:
+                for line in fh:
+                    out_json.write(line)
+                    out_text.write(format_record(json.loads(line)))
+
+    merged = {
+        "root": manifests[0]["root"],
+        "shard_count": shard_count,
+        "shards_merged": sorted(present),
+        "shards_missing": missing,
+        "files": sum(m["files"] for m in manifests),
+        "records": sum(m["records"] for m in manifests),
+        "errors": sum(m["errors"] for m in manifests),
+        "started_at": min(m["started_at"] for m in manifests),
+        "finished_at": max(m["finished_at"] for m in manifests),
+        "output": os.path.basename(merged_jsonl),
+        "text_output": os.path.basename(merged_text),
+        "images": IMAGES_DIR,
+    }
+    with open(os.path.join(out_dir, "merged.manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump(merged, fh, indent=2)
+
+    if missing:
+        print(f"⚠️ Missing shards: {missing}", file=sys.stderr)
+    print(
+        f"✅ Merged {len(present)}/{shard_count} shards: "
+        f"{merged['records']} records, {merged['errors']} errors",
+        file=sys.stderr,
+    )
+    return merged
+
+
+# --------------------------------------------------------------------
+# CLI
+# --------------------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded, non-interactive batch parsing.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="parse one shard of a root folder")
+    run.add_argument("root", help="folder to scan recursively")
+    run.add_argument("--out", required=True, help="shared output folder")
+    run.add_argument("--shard-index", type=int, default=int(os.getenv("SHARD_INDEX", "0")))
+    run.add_argument("--shard-count", type=int, default=int(os.getenv("SHARD_COUNT", "1")))
+    run.add_argument("--workers", type=int, default=None, help="parse processes on this node")
+    run.add_argument("--session-id", default="batch", help="image output sub-folder")
+
+    merge = sub.add_parser("merge", help="merge finished shard outputs")
+    merge.add_argument("--out", required=True, help="shared output folder")
+    merge.add_argument("--output-file", default="parsed_output.txt")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run_shard(
+            args.root, args.out,
+            shard_index=args.shard_index,
+            shard_count=args.shard_count,
+            session_id=args.session_id,
+            max_workers=args.workers,
+        )
+        return 0
+
+    merged = merge_shards(args.out, output_file=args.output_file)
+    return 1 if merged["shards_missing"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,38 @@
 # stage_1_parsing/excel_parser.py
 
 import os
-from io import StringIO
+from io import BytesIO, StringIO
 import pandas as pd
 from openpyxl import load_workbook
 from typing import Tuple, List
 
-def parse_excel(file_path: str, session_id: str) -> Tuple[str, List[str]]:
+from .sources import Source, image_dir, is_path, read_source, source_name
+
+def parse_excel(file_path: Source, session_id: str, name: str = None) -> Tuple[str, List[str]]:
     saved_images = []
+    base = source_name(file_path, name)
+
+    # buffers are read twice (pandas, then openpyxl for images)
+    data = None if is_path(file_path) else read_source(file_path)
+
+    def fresh():
+        return file_path if data is None else BytesIO(data)
 
-    images_dir = os.path.join("Outputs", "excel_images", session_id)
-    os.makedirs(images_dir, exist_ok=True)
+    images_dir = image_dir("excel", session_id)
 
     # read CSV-like content
-    df = pd.read_excel(file_path, engine="openpyxl")
+    df = pd.read_excel(fresh(), engine="openpyxl")
     buf = StringIO()
     df.to_csv(buf, index=False)
     csv_content = buf.getvalue()
 
     # extract images
     try:
-        wb = load_workbook(file_path, data_only=True)
+        wb = load_workbook(fresh(), data_only=True)
         for sheet in wb.sheetnames:
             ws = wb[sheet]
             for idx, img in enumerate(getattr(ws, "_images", []) or []):
-                img_name = f"{os.path.basename(file_path)}_{sheet}_{idx+1}.png"
+                img_name = f"{base}_{sheet}_{idx+1}.png"
                 img_path = os.path.join(images_dir, img_name)
 
                 try:
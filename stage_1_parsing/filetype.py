@@ -0,0 +1,52 @@
+# stage_1_parsing/filetype.py
+"""
+Magic-byte sniffing so mislabeled uploads are routed to the right parser.
+"""
+
+import zipfile
+from typing import Optional
+
+from .legacy_office import OLE_MAGIC, OleFile, OleError
+from .sources import Source, open_source
+
+_PDF_MAGIC = b"%PDF-"
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def sniff_type(file_path: Source) -> Optional[str]:
+    """
+    Return the real extension (".pdf", ".docx", ".xlsx", ".doc", ".xls")
+    based on file content, or None when it cannot be determined.
+    """
+    try:
+        with open_source(file_path) as fh:
+            head = fh.read(1024)
+
+            if head.startswith(OLE_MAGIC):
+                try:
+                    ole = OleFile(fh)
+                except OleError:
+                    return None
+                if ole.exists("WordDocument"):
+                    return ".doc"
+                if ole.exists("Workbook") or ole.exists("Book"):
+                    return ".xls"
+                return None
+
+            if head.startswith(_ZIP_MAGIC):
+                try:
+                    names = zipfile.ZipFile(fh).namelist()
+                except zipfile.BadZipFile:
+                    return None
+                if "word/document.xml" in names:
+                    return ".docx"
+                if "xl/workbook.xml" in names:
+                    return ".xlsx"
+                return None
+    except OSError:
+        return None
+
+    # PDF header may be preceded by junk bytes
+    if _PDF_MAGIC in head:
+        return ".pdf"
+    return None
@@ -0,0 +1,347 @@
+# stage_1_parsing/legacy_excel_parser.py
+
+import os
+import re
+import csv
+import codecs
+import struct
+from io import StringIO
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from .legacy_office import OleFile, extract_blips
+from .sources import Source, image_dir, open_source, source_name
+
+# BIFF record ids
+_BOF = 0x0809
+_EOF = 0x000A
+_CONTINUE = 0x003C
+_FILEPASS = 0x002F
+_CODEPAGE = 0x0042
+_DATEMODE = 0x0022
+_FORMAT = 0x041E
+_XF = 0x00E0
+_BOUNDSHEET = 0x0085
+_SST = 0x00FC
+_MSODRAWINGGROUP = 0x00EB
+_LABELSST = 0x00FD
+_LABEL = 0x0204
+_NUMBER = 0x0203
+_RK = 0x027E
+_MULRK = 0x00BD
+_BOOLERR = 0x0205
+_FORMULA = 0x0006
+_STRING = 0x0207
+
+_BIFF8 = 0x0600
+
+# built-in number formats that display dates/times
+_DATE_FORMAT_IDS = set(range(14, 23)) | set(range(27, 37)) | {45, 46, 47} | set(range(50, 59))
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|_.|\*.')
+_DATE_TOKENS = re.compile(r"[dmyhs]", re.IGNORECASE)
+
+
+def _records(stream: bytes) -> Iterator[Tuple[int, List[bytes], int]]:
+    """
+    Yield (record id, [data, continue data...], stream offset) for each record.
+    """
+    pos = 0
+    end = len(stream)
+    pending = None
+    while pos + 4 <= end:
+        rid, size = struct.unpack_from("<HH", stream, pos)
+        data = stream[pos + 4:pos + 4 + size]
+        if rid == _CONTINUE and pending is not None:
+            pending[1].append(data)
+        else:
+            if pending is not None:
+                yield pending
+            pending = (rid, [data], pos)
+        pos += 4 + size
+    if pending is not None:
+        yield pending
+
+
+class _SegmentReader:
+    """
+    Reads across CONTINUE boundaries; strings split mid-characters restart
+    with a fresh option byte at the start of the next segment.
+    """
+
+    def __init__(self, segments: List[bytes], codec: str = "latin-1"):
+        self.segments = segments
+        self.codec = codec
+        self.i = 0
+        self.pos = 0
+
+    def _next_segment(self) -> bool:
+        if self.i + 1 >= len(self.segments):
+            return False
+        self.i += 1
+        self.pos = 0
+        return True
+
+    def read(self, n: int) -> bytes:
+        out = []
+        while n > 0:
+            seg = self.segments[self.i]
+            if self.pos >= len(seg):
+                if not self._next_segment():
+                    raise ValueError("Corrupt .xls: record truncated")
+                continue
+            chunk = seg[self.pos:self.pos + n]
+            out.append(chunk)
+            self.pos += len(chunk)
+            n -= len(chunk)
+        return b"".join(out)
+
+    def u8(self) -> int:
+        return self.read(1)[0]
+
+    def u16(self) -> int:
+        return struct.unpack("<H", self.read(2))[0]
+
+    def u32(self) -> int:
+        return struct.unpack("<I", self.read(4))[0]
+
+    def chars(self, count: int, wide: bool) -> str:
+        out = []
+        while count > 0:
+            seg = self.segments[self.i]
+            width = 2 if wide else 1
+            take = min(count, (len(seg) - self.pos) // width)
+            if take <= 0:
+                if not self._next_segment():
+                    raise ValueError("Corrupt .xls: string truncated")
+                wide = bool(self.u8() & 0x01)
+                continue
+            chunk = seg[self.pos:self.pos + take * width]
+            out.append(chunk.decode("utf-16-le" if wide else self.codec, errors="replace"))
+            self.pos += take * width
+            count -= take
+        return "".join(out)
+
+    def unicode_string(self, short: bool = False) -> str:
+        """XLUnicodeString / XLUnicodeRichExtendedString (BIFF8)."""
+        cch = self.u8() if short else self.u16()
+        flags = self.u8()
+        runs = self.u16() if flags & 0x08 else 0
+        ext = self.u32() if flags & 0x04 else 0
+        text = self.chars(cch, bool(flags & 0x01))
+        if runs:
+            self.read(4 * runs)
+        if ext:
+            self.read(ext)
+        return text
+
+
+def _byte_string(data: bytes, offset: int, codec: str, short: bool = False) -> str:
+    """8-bit codepage string used by BIFF5."""
+    if short:
+        cch = data[offset]
+        offset += 1
+    else:
+        cch = struct.unpack_from("<H", data, offset)[0]
+        offset += 2
+    return data[offset:offset + cch].decode(codec, errors="replace")
+
+
+def _decode_rk(rk: int) -> float:
+    if rk & 0x02:
+        value = float(struct.unpack("<i", struct.pack("<I", rk))[0] >> 2)
+    else:
+        value = struct.unpack("<d", struct.pack("<Q", (rk & 0xFFFFFFFC) << 32))[0]
+    return value / 100 if rk & 0x01 else value
+
+
+def _is_date_format(ifmt: int, formats: Dict[int, str]) -> bool:
+    if ifmt in _DATE_FORMAT_IDS:
+        return True
+    fmt = formats.get(ifmt)
+    if not fmt:
+        return False
+    fmt = _FORMAT_LITERALS.sub("", fmt.split(";")[0])
+    return bool(_DATE_TOKENS.search(fmt)) and fmt.lower() != "general"
+
+
+def _format_number(value: float, is_date: bool, datemode: int) -> str:
+    if is_date:
+        base = datetime(1904, 1, 1) if datemode else datetime(1899, 12, 30)
+        dt = base + timedelta(days=value)
+        if value == int(value):
+            return dt.strftime("%Y-%m-%d")
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _read_workbook(stream: bytes):
+    """
+    Return (first worksheet name, {(row, col): text}, OfficeArt drawing data).
+    """
+    codec = "cp1252"
+    datemode = 0
+    biff = _BIFF8
+    formats: Dict[int, str] = {}
+    xf_formats: List[int] = []
+    sheets: List[Tuple[str, int]] = []
+    sst: List[str] = []
+    drawing = b""
+
+    cells: Dict[Tuple[int, int], str] = {}
+    sheet_name = None
+    sheet_pos = None
+    in_sheet = False
+    pending_formula = None
+
+    def put_number(row, col, xf, value):
+        ifmt = xf_formats[xf] if xf < len(xf_formats) else 0
+        cells[(row, col)] = _format_number(value, _is_date_format(ifmt, formats), datemode)
+
+    for rid, segments, offset in _records(stream):
+        data = segments[0]
+
+        if rid == _BOF:
+            version = struct.unpack_from("<H", data, 0)[0]
+            if offset == 0:
+                biff = version if version in (0x0500, _BIFF8) else _BIFF8
+            elif sheet_pos is None and sheets:
+                # BOUNDSHEET offsets tell us which substream is the first worksheet
+                sheet_name, sheet_pos = sheets[0]
+            in_sheet = offset == sheet_pos
+            continue
+
+        if rid == _EOF:
+            if in_sheet:
+                break
+            continue
+
+        if not in_sheet:
+            if rid == _FILEPASS:
+                raise ValueError("Encrypted .xls files are not supported")
+            elif rid == _CODEPAGE:
+                cp = struct.unpack_from("<H", data, 0)[0]
+                if biff != _BIFF8 and cp not in (1200, 32768, 32769):
+                    try:
+                        codec = codecs.lookup(f"cp{cp}").name
+                    except LookupError:
+                        pass
+            elif rid == _DATEMODE:
+                datemode = struct.unpack_from("<H", data, 0)[0]
+            elif rid == _FORMAT:
+                ifmt = struct.unpack_from("<H", data, 0)[0]
+                if biff == _BIFF8:
+                    reader = _SegmentReader(segments)
+                    reader.read(2)
+                    formats[ifmt] = reader.unicode_string()
+                else:
+                    formats[ifmt] = _byte_string(data, 2, codec, short=True)
+            elif rid == _XF:
+                xf_formats.append(struct.unpack_from("<H", data, 2)[0])
+            elif rid == _BOUNDSHEET:
+                pos, _, dt = struct.unpack_from("<IBB", data, 0)
+                if biff == _BIFF8:
+                    name = _SegmentReader([data[6:]]).unicode_string(short=True)
+                else:
+                    name = _byte_string(data, 6, codec, short=True)
+                if dt == 0:
+                    sheets.append((name, pos))
+            elif rid == _SST:
+                reader = _SegmentReader(segments)
+                reader.read(4)
+                unique = reader.u32()
+                for _ in range(unique):
+                    sst.append(reader.unicode_string())
+            elif rid == _MSODRAWINGGROUP:
+                drawing += b"".join(segments)
+            continue
+
+        # ---- worksheet cell records ----
+        if rid == _LABELSST:
+            row, col, _, isst = struct.unpack_from("<HHHI", data, 0)
+            if isst < len(sst):
+                cells[(row, col)] = sst[isst]
+        elif rid == _LABEL:
+            row, col = struct.unpack_from("<HH", data, 0)
+            if biff == _BIFF8:
+                cells[(row, col)] = _SegmentReader([data[6:]] + segments[1:]).unicode_string()
+            else:
+                cells[(row, col)] = _byte_string(data, 6, codec)
+        elif rid == _NUMBER:
+            row, col, xf, value = struct.unpack_from("<HHHd", data, 0)
+            put_number(row, col, xf, value)
+        elif rid == _RK:
+            row, col, xf, rk = struct.unpack_from("<HHHI", data, 0)
+            put_number(row, col, xf, _decode_rk(rk))
+        elif rid == _MULRK:
+            row, first = struct.unpack_from("<HH", data, 0)
+            count = (len(data) - 6) // 6
+            for i in range(count):
+                xf, rk = struct.unpack_from("<HI", data, 4 + 6 * i)
+                put_number(row, first + i, xf, _decode_rk(rk))
+        elif rid == _BOOLERR:
+            row, col, _, value, is_error = struct.unpack_from("<HHHBB", data, 0)
+            if not is_error:
+                cells[(row, col)] = "True" if value else "False"
+        elif rid == _FORMULA:
+            row, col, xf = struct.unpack_from("<HHH", data, 0)
+            result = data[6:14]
+            if result[6:8] != b"\xff\xff":
+                put_number(row, col, xf, struct.unpack("<d", result)[0])
+            elif result[0] == 0x00:
+                pending_formula = (row, col)
+            elif result[0] == 0x01:
+                cells[(row, col)] = "True" if result[2] else "False"
+        elif rid == _STRING and pending_formula is not None:
+            if biff == _BIFF8:
+                cells[pending_formula] = _SegmentReader(segments).unicode_string()
+            else:
+                cells[pending_formula] = _byte_string(data, 0, codec)
+            pending_formula = None
+
+    return sheet_name, cells, drawing
+
+
+def parse_xls(file_path: Source, session_id: str, name: str = None) -> Tuple[str, List[str]]:
+    """
+    Parse a legacy BIFF (Excel 97-2003) workbook; returns the first sheet as CSV.
+    """
+    saved_images = []
+
+    images_dir = image_dir("excel", session_id)
+
+    with open_source(file_path) as fh:
+        ole = OleFile(fh)
+        if ole.exists("Workbook"):
+            stream = ole.read_stream("Workbook")
+        elif ole.exists("Book"):
+            stream = ole.read_stream("Book")
+        else:
+            raise ValueError("Not an Excel workbook: no Workbook stream")
+
+    sheet_name, cells, drawing = _read_workbook(stream)
+
+    # read CSV-like content
+    buf = StringIO()
+    if cells:
+        first_row = min(r for r, _ in cells)
+        last_row = max(r for r, _ in cells)
+        last_col = max(c for _, c in cells)
+        writer = csv.writer(buf, lineterminator="\n")
+        for r in range(first_row, last_row + 1):
+            writer.writerow([cells.get((r, c), "") for c in range(last_col + 1)])
+    csv_content = buf.getvalue()
+
+    # extract images
+    base = source_name(file_path, name)
+    for idx, (ext, img_bytes) in enumerate(extract_blips(drawing)):
+        img_name = f"{base}_{sheet_name or 'Sheet1'}_{idx+1}.{ext}"
+        img_path = os.path.join(images_dir, img_name)
+
+        with open(img_path, "wb") as fh:
+            fh.write(img_bytes)
+
+        saved_images.append(img_path)
+
+    return csv_content, saved_images
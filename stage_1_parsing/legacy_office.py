@@ -0,0 +1,211 @@
+# stage_1_parsing/legacy_office.py
+"""
+Minimal readers for legacy (pre-2007) binary Office files.
+
+OleFile reads streams out of an OLE2 / Compound File Binary container
+(.doc, .xls), and extract_blips pulls embedded JPEG/PNG pictures out of
+OfficeArt drawing data. Pure python, no third-party dependencies.
+"""
+
+import re
+import struct
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+FREESECT = 0xFFFFFFFF
+ENDOFCHAIN = 0xFFFFFFFE
+NOSTREAM = 0xFFFFFFFF
+
+_STREAM = 2
+_ROOT = 5
+
+
+class OleError(ValueError):
+    pass
+
+
+class OleFile:
+    """
+    Read-only access to the top-level streams of a compound file.
+
+        with open(path, "rb") as fh:
+            ole = OleFile(fh)
+            data = ole.read_stream("WordDocument")
+    """
+
+    def __init__(self, fh: BinaryIO):
+        self._fh = fh
+
+        header = self._read_at(0, 512)
+        if len(header) < 512 or header[:8] != OLE_MAGIC:
+            raise OleError("Not an OLE2 compound file")
+
+        sector_shift, mini_shift = struct.unpack_from("<HH", header, 0x1E)
+        self.sector_size = 1 << sector_shift
+        self.mini_sector_size = 1 << mini_shift
+
+        (num_fat, first_dir, _, self.mini_cutoff,
+         first_minifat, _, first_difat, num_difat) = struct.unpack_from("<8I", header, 0x2C)
+
+        # master sector allocation table: 109 entries in header + DIFAT chain
+        difat = list(struct.unpack_from("<109I", header, 0x4C))
+        sid = first_difat
+        per_sector = self.sector_size // 4 - 1
+        for _ in range(num_difat):
+            if sid in (FREESECT, ENDOFCHAIN):
+                break
+            entries = struct.unpack("<%dI" % (per_sector + 1), self._read_sector(sid))
+            difat.extend(entries[:per_sector])
+            sid = entries[per_sector]
+
+        fat_sids = [s for s in difat[:num_fat] if s not in (FREESECT, ENDOFCHAIN)]
+        fat_bytes = b"".join(self._read_sector(s) for s in fat_sids)
+        self._fat = struct.unpack("<%dI" % (len(fat_bytes) // 4), fat_bytes)
+
+        dir_bytes = self._read_chain(first_dir)
+        self._entries = [
+            self._parse_dir_entry(dir_bytes[i:i + 128])
+            for i in range(0, len(dir_bytes) - 127, 128)
+        ]
+        if not self._entries or self._entries[0]["type"] != _ROOT:
+            raise OleError("Missing root directory entry")
+
+        self._minifat = None
+        self._first_minifat = first_minifat
+        self._ministream = None
+
+        self._streams = self._top_level_streams()
+
+    # ---------------- low level ----------------
+    def _read_at(self, offset: int, size: int) -> bytes:
+        self._fh.seek(offset)
+        return self._fh.read(size)
+
+    def _read_sector(self, sid: int) -> bytes:
+        return self._read_at((sid + 1) * self.sector_size, self.sector_size)
+
+    def _chain(self, start: int, table) -> List[int]:
+        chain = []
+        seen = set()
+        sid = start
+        while sid not in (ENDOFCHAIN, FREESECT) and sid < len(table):
+            if sid in seen:
+                raise OleError("Cyclic sector chain")
+            seen.add(sid)
+            chain.append(sid)
+            sid = table[sid]
+        return chain
+
+    def _read_chain(self, start: int) -> bytes:
+        return b"".join(self._read_sector(s) for s in self._chain(start, self._fat))
+
+    @staticmethod
+    def _parse_dir_entry(raw: bytes) -> Dict:
+        name_len = struct.unpack_from("<H", raw, 0x40)[0]
+        name = raw[:max(0, name_len - 2)].decode("utf-16-le", errors="replace")
+        left, right, child = struct.unpack_from("<III", raw, 0x44)
+        start, size = struct.unpack_from("<IQ", raw, 0x74)
+        return {
+            "name": name,
+            "type": raw[0x42],
+            "left": left,
+            "right": right,
+            "child": child,
+            "start": start,
+            "size": size,
+        }
+
+    def _top_level_streams(self) -> Dict[str, Dict]:
+        streams = {}
+        stack = [self._entries[0]["child"]]
+        seen = set()
+        while stack:
+            idx = stack.pop()
+            if idx == NOSTREAM or idx >= len(self._entries) or idx in seen:
+                continue
+            seen.add(idx)
+            entry = self._entries[idx]
+            streams[entry["name"].lower()] = entry
+            stack.append(entry["left"])
+            stack.append(entry["right"])
+        return streams
+
+    def _load_mini(self) -> None:
+        if self._ministream is not None:
+            return
+        root = self._entries[0]
+        self._ministream = self._read_chain(root["start"])[:root["size"]]
+        raw = self._read_chain(self._first_minifat)
+        self._minifat = struct.unpack("<%dI" % (len(raw) // 4), raw)
+
+    # ---------------- public ----------------
+    def listdir(self) -> List[str]:
+        return [e["name"] for e in self._streams.values() if e["type"] == _STREAM]
+
+    def exists(self, name: str) -> bool:
+        entry = self._streams.get(name.lower())
+        return entry is not None and entry["type"] == _STREAM
+
+    def read_stream(self, name: str) -> bytes:
+        entry = self._streams.get(name.lower())
+        if entry is None or entry["type"] != _STREAM:
+            raise OleError(f"Stream not found: {name}")
+
+        size = entry["size"]
+        if self.sector_size == 512:
+            size &= 0xFFFFFFFF
+
+        if size < self.mini_cutoff:
+            self._load_mini()
+            mss = self.mini_sector_size
+            data = b"".join(
+                self._ministream[s * mss:(s + 1) * mss]
+                for s in self._chain(entry["start"], self._minifat)
+            )
+        else:
+            data = self._read_chain(entry["start"])
+
+        return data[:size]
+
+
+# --------------------------------------------------------------------
+# OfficeArt pictures
+# --------------------------------------------------------------------
+# recType -> (extension, {recInstance: number of 16-byte UIDs})
+_BLIP_TYPES: Dict[int, Tuple[str, Dict[int, int]]] = {
+    0xF01D: ("jpeg", {0x46A: 1, 0x46B: 2, 0x6E2: 1, 0x6E3: 2}),
+    0xF02A: ("jpeg", {0x46A: 1, 0x46B: 2, 0x6E2: 1, 0x6E3: 2}),
+    0xF01E: ("png", {0x6E0: 1, 0x6E1: 2}),
+}
+
+# little-endian recType bytes of the records above, preceded by recVer/recInstance
+_BLIP_RECTYPE = re.compile(rb"(?<=..)[\x1d\x1e\x2a]\xf0", re.DOTALL)
+
+_SIGNATURES = {"jpeg": b"\xff\xd8\xff", "png": b"\x89PNG\r\n\x1a\n"}
+
+
+def extract_blips(data: Union[bytes, bytearray]) -> List[Tuple[str, bytes]]:
+    """
+    Scan OfficeArt data for JPEG/PNG BLIP records and return (ext, bytes) pairs.
+    """
+    found = []
+    end = len(data)
+    next_free = 0
+    for match in _BLIP_RECTYPE.finditer(data):
+        pos = match.start() - 2
+        if pos < next_free or pos + 8 > end:
+            continue
+
+        ver_inst, rec_type, rec_len = struct.unpack_from("<HHI", data, pos)
+        ext, instances = _BLIP_TYPES[rec_type]
+        uids = instances.get(ver_inst >> 4)
+        body_end = pos + 8 + rec_len
+        if uids is None or body_end > end:
+            continue
+
+        img_start = pos + 8 + 16 * uids + 1
+        if data[img_start:img_start + len(_SIGNATURES[ext])] == _SIGNATURES[ext]:
+            found.append((ext, bytes(data[img_start:body_end])))
+            next_free = body_end
+    return found
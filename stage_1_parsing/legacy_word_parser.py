@@ -0,0 +1,136 @@
+# stage_1_parsing/legacy_word_parser.py
+
+import os
+import re
+import struct
+from typing import List, Tuple
+
+from .legacy_office import OleFile, extract_blips
+from .sources import Source, image_dir, open_source, source_name
+
+_FIB_IDENT = 0xA5EC
+# control characters with no text meaning (pictures, footnote refs, ...)
+_DROP = re.compile("[\x00-\x06\x08\x0e-\x12\x16-\x1d\x1f]")
+
+
+def _read_main_text(word_doc: bytes, table: bytes, ccp_text: int, fc_clx: int, lcb_clx: int) -> str:
+    """
+    Rebuild the main document text from the piece table in the CLX.
+    """
+    clx = table[fc_clx:fc_clx + lcb_clx]
+    pos = 0
+    # skip Prc (property modifiers) until the Pcdt
+    while pos < len(clx) and clx[pos] == 0x01:
+        cb = struct.unpack_from("<h", clx, pos + 1)[0]
+        pos += 3 + cb
+    if pos >= len(clx) or clx[pos] != 0x02:
+        raise ValueError("Corrupt .doc: piece table not found")
+
+    lcb = struct.unpack_from("<I", clx, pos + 1)[0]
+    plc = clx[pos + 5:pos + 5 + lcb]
+    n = (lcb - 4) // 12
+    cps = struct.unpack_from("<%dI" % (n + 1), plc, 0)
+
+    parts = []
+    remaining = ccp_text
+    for i in range(n):
+        if remaining <= 0:
+            break
+        count = min(cps[i + 1] - cps[i], remaining)
+        fc = struct.unpack_from("<I", plc, 4 * (n + 1) + 8 * i + 2)[0]
+        if fc & 0x40000000:
+            start = (fc & 0x3FFFFFFF) // 2
+            parts.append(word_doc[start:start + count].decode("cp1252", errors="replace"))
+        else:
+            parts.append(word_doc[fc:fc + 2 * count].decode("utf-16-le", errors="replace"))
+        remaining -= count
+    return "".join(parts)
+
+
+def _strip_fields(text: str) -> str:
+    """
+    Keep field results and drop field codes (\\x13 code \\x14 result \\x15).
+    """
+    if "\x13" not in text:
+        return text
+
+    out = []
+    # one entry per open field: True while inside its code part
+    stack: List[bool] = []
+    for ch in text:
+        if ch == "\x13":
+            stack.append(True)
+        elif ch == "\x14":
+            if stack:
+                stack[-1] = False
+        elif ch == "\x15":
+            if stack:
+                stack.pop()
+        elif not any(stack):
+            out.append(ch)
+    return "".join(out)
+
+
+def _to_paragraphs(text: str) -> List[str]:
+    text = _strip_fields(text)
+    text = text.replace("\x1e", "-").replace("\x0b", "\n").replace("\x0c", "\n")
+    text = _DROP.sub("", text)
+
+    paragraphs = []
+    for chunk in text.split("\r"):
+        if "\x07" in chunk:
+            # table cells end with \x07, rows with an extra \x07 mark
+            for row in chunk.split("\x07\x07"):
+                cells = [c.strip() for c in row.split("\x07")]
+                if any(cells):
+                    paragraphs.append(",".join(cells))
+            continue
+        tx = chunk.strip()
+        if tx:
+            paragraphs.append(tx)
+    return paragraphs
+
+
+def parse_doc(file_path: Source, session_id: str, name: str = None) -> Tuple[str, List[str]]:
+    """
+    Parse a legacy binary Word (97-2003) document without Word or python-docx.
+    """
+    saved_images = []
+
+    images_dir = image_dir("word", session_id)
+
+    with open_source(file_path) as fh:
+        ole = OleFile(fh)
+        word_doc = ole.read_stream("WordDocument")
+
+        ident, nfib = struct.unpack_from("<HH", word_doc, 0)
+        if ident != _FIB_IDENT or nfib < 101:
+            raise ValueError("Unsupported .doc: pre-Word 97 format")
+
+        flags = struct.unpack_from("<H", word_doc, 0x0A)[0]
+        if flags & 0x0100:
+            raise ValueError("Encrypted .doc files are not supported")
+
+        table_name = "1Table" if flags & 0x0200 else "0Table"
+        table = ole.read_stream(table_name)
+        data = ole.read_stream("Data") if ole.exists("Data") else b""
+
+    ccp_text = struct.unpack_from("<i", word_doc, 0x4C)[0]
+    fc_clx, lcb_clx = struct.unpack_from("<II", word_doc, 0x01A2)
+
+    text = _read_main_text(word_doc, table, ccp_text, fc_clx, lcb_clx)
+    paragraphs = _to_paragraphs(text)
+
+    # pictures live in the Data stream (inline) or WordDocument (floating)
+    base = source_name(file_path, name)
+    blips = extract_blips(data) + extract_blips(word_doc)
+    for idx, (ext, img_bytes) in enumerate(blips):
+        img_name = f"{base}_{idx+1}.{ext}"
+        img_path = os.path.join(images_dir, img_name)
+
+        with open(img_path, "wb") as fh:
+            fh.write(img_bytes)
+
+        saved_images.append(img_path)
+
+    return "\n\n".join(paragraphs).strip(), saved_images
@@ -4,15 +4,24 @@ import pymupdf as fitz
 import os
 from typing import Tuple, List
 
-def parse_pdf(file_path: str, session_id: str) -> Tuple[str, List[str]]:
-    text_parts = []
+from .sources import Source, image_dir, is_path, read_source, source_name
+
+def parse_pdf(file_path: Source, session_id: str, name: str = None) -> Tuple[str, List[str], List[str]]:
+    pages = []
     saved_images = []
 
-    images_dir = os.path.join("Outputs", "pdf_images", session_id)
-    os.makedirs(images_dir, exist_ok=True)
+    images_dir = image_dir("pdf", session_id)
+
+    base = source_name(file_path, name)
+    if is_path(file_path):
+        pdf_doc = fitz.open(file_path)
+    else:
+        pdf_doc = fitz.open(stream=read_source(file_path), filetype="pdf")
 
-    with fitz.open(file_path) as pdf:
+    with pdf_doc as pdf:
         for page_index, page in enumerate(pdf):
+            text_parts = []
+
             # extract text blocks safely
             try:
                 blocks = page.get_text("blocks")
@@ -30,7 +39,7 @@ def parse_pdf(file_path: str, session_id: str) -> Tuple[str, List[str]]:
                     img_bytes = base_image["image"]
                     ext = base_image.get("ext", "png")
 
-                    img_name = f"{os.path.basename(file_path)}_p{page_index+1}_{img_index+1}.{ext}"
+                    img_name = f"{base}_p{page_index+1}_{img_index+1}.{ext}"
                     img_path = os.path.join(images_dir, img_name)
 
                     with open(img_path, "wb") as fh:
@@ -40,4 +49,7 @@ def parse_pdf(file_path: str, session_id: str) -> Tuple[str, List[str]]:
                 except:
                     continue
 
-    return "\n".join(text_parts).strip(), saved_images
+            pages.append("\n".join(text_parts).strip())
+
+    # page texts are returned separately so the search index can key hits by page
+    return "\n".join(p for p in pages if p), saved_images, pages
@@ -1,96 +1,234 @@
 # stage_1_parsing/process_files.py
 
 import os
-from typing import List, Dict, Callable
-import pandas as pd
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
 from io import StringIO
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
-from .pdf_parser import parse_pdf
-from .word_parser import parse_word
-from .excel_parser import parse_excel
+# parser registry (parser modules are imported on first use)
+from .registry import PARSERS
+from .filetype import sniff_type
+from .archives import ArchiveLimitError, is_archive, iter_archive_members
+from .sources import Source
 
-# parser registry
-PARSERS: Dict[str, Callable] = {
-    ".pdf": parse_pdf,
-    ".docx": parse_word,
-    ".doc": parse_word,
-    ".xlsx": parse_excel,
-    ".xls": parse_excel,
-}
+if TYPE_CHECKING:
+    import pandas as pd
 
-def _process_single(file_path: str, session_id: str) -> Dict:
+COLUMNS = ["file_name", "file_type", "content", "images", "error"]
+
+
+def _record(file_name: str, file_type: str, content="", images=None, error=None, pages=None) -> Dict:
+    record = {
+        "file_name": file_name,
+        "file_type": file_type,
+        "content": content,
+        "images": images or [],
+        "error": error,
+    }
+    # page texts (PDF) are only used for search indexing, never written out
+    if pages is not None:
+        record["pages"] = pages
+    return record
+
+
+def _parse(source: Source, display_name: str, session_id: str, name: str = None) -> Dict:
     """
-    Worker: parse a single file and return dict including images.
+    The parser is chosen from the content's magic bytes, falling back to the extension.
     """
-    ext = os.path.splitext(file_path)[1].lower()
-    base = os.path.basename(file_path)
-
-    parser = PARSERS.get(ext)
-    if parser is None:
-        return {
-            "file_name": base,
-            "file_type": ext,
-            "content": "",
-            "images": [],
-            "error": f"Unsupported type: {ext}",
-        }
+    ext = sniff_type(source) or os.path.splitext(display_name)[1].lower()
 
     try:
-        content, images = parser(file_path, session_id=session_id)
-        return {
-            "file_name": base,
-            "file_type": ext,
-            "content": content,
-            "images": images,
-            "error": None,
-        }
+        # lazy entries import their module here, so a broken plugin or a
+        # missing backend fails this file only
+        parser = PARSERS.get(ext)
+        if parser is None:
+            return _record(display_name, ext, error=f"Unsupported type: {ext}")
+        result = parser(source, session_id=session_id, name=name)
+        pages = result[2] if len(result) > 2 else None
+        return _record(display_name, ext, result[0], result[1], pages=pages)
     except Exception as e:
-        return {
-            "file_name": base,
-            "file_type": ext,
-            "content": "",
-            "images": [],
-            "error": str(e),
-        }
+        return _record(display_name, ext, error=str(e))
+
+
+def _flat_name(display_name: str) -> str:
+    # relative paths can't be used as image file names
+    return display_name.replace("/", "_").replace("\\", "_")
+
+
+def _process_single(file_path: str, session_id: str, display_name: str = None) -> Dict:
+    """
+    Worker: parse a single file and return dict including images.
+    Root-relative display names (batch runs) also name the images, so
+    a/report.pdf and b/report.pdf don't overwrite each other's.
+    """
+    display_name = display_name or os.path.basename(file_path)
+    name = _flat_name(display_name) if display_name != os.path.basename(file_path) else None
+    return _parse(file_path, display_name, session_id, name=name)
 
 
-def process_folder(folder_path: str, session_id: str, max_workers: int = None) -> pd.DataFrame:
+def _process_buffer(data: bytes, display_name: str, session_id: str) -> Dict:
+    """
+    Worker: parse an in-memory file (e.g. an archive member).
+    """
+    return _parse(data, display_name, session_id, name=_flat_name(display_name))
+
+
+def _is_parseable(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in PARSERS
+
+
+def _iter_tasks(files: Iterable[str], session_id: str, root: str = None):
+    """
+    Yield (source path, ("submit", fn, args)) work items, or
+    (source path, ("done", record)) for errors detected up front
+    (e.g. an archive hitting a limit).
+    """
+    for path in files:
+        display = os.path.relpath(path, root) if root else os.path.basename(path)
+
+        if not is_archive(path):
+            yield path, ("submit", _process_single, (path, session_id, display))
+            continue
+
+        try:
+            for member, data in iter_archive_members(path, _is_parseable):
+                yield path, ("submit", _process_buffer, (data, f"{display}/{member}", session_id))
+        except ArchiveLimitError as e:
+            yield path, ("done", _record(display, "archive", error=str(e)))
+        except Exception as e:
+            yield path, ("done", _record(display, "archive", error=f"Unreadable archive: {e}"))
+
+
+def iter_parsed(
+    files: Iterable[str],
+    session_id: str,
+    max_workers: int = None,
+    root: str = None,
+) -> Iterator[Dict]:
+    """
+    Parse files (zip/tar archives are expanded in memory) and yield records
+    as they complete. At most a few tasks per worker are in flight, so
+    archive members are never all held in memory at once.
+
+    Records are named by base name, or by path relative to `root` when
+    given, and carry the input path they came from under "source".
+    """
+    if max_workers is None:
+        import multiprocessing
+        max_workers = min(4, multiprocessing.cpu_count() or 1)
+
+    max_in_flight = max_workers * 4
+
+    def finished(done):
+        for fut in done:
+            record = fut.result()
+            record["source"] = pending.pop(fut)
+            yield record
+
+    with ProcessPoolExecutor(max_workers=max_workers) as exe:
+        pending = {}
+        for source, task in _iter_tasks(files, session_id, root=root):
+            if task[0] == "done":
+                task[1]["source"] = source
+                yield task[1]
+                continue
+
+            _, fn, args = task
+            pending[exe.submit(fn, *args)] = source
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from finished(done)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from finished(done)
+
+
+def process_folder(
+    folder_path: str,
+    session_id: str,
+    max_workers: int = None,
+    on_result: Optional[Callable[[Dict], None]] = None,
+) -> "pd.DataFrame":
     """
     Process all files in a folder and return a DataFrame including images.
+    Archives are parsed member by member and reported as "<archive>/<member>".
+    on_result (if given) is called with each record as soon as it is parsed.
     """
+    import pandas as pd
+
     files = []
 
     for entry in os.listdir(folder_path):
         full = os.path.join(folder_path, entry)
-        if os.path.isfile(full):
-            ext = os.path.splitext(full)[1].lower()
-            if ext in PARSERS:
-                files.append(full)
+        if os.path.isfile(full) and (_is_parseable(full) or is_archive(full)):
+            files.append(full)
 
     if not files:
-        return pd.DataFrame(columns=["file_name", "file_type", "content", "images", "error"])
+        return pd.DataFrame(columns=COLUMNS)
 
-    # multiprocess
-    if max_workers is None:
-        import multiprocessing
-        max_workers = min(4, multiprocessing.cpu_count() or 1)
+    results = []
+    for record in iter_parsed(files, session_id, max_workers=max_workers):
+        if on_result is not None:
+            on_result(record)
+        results.append(record)
+
+    df = pd.DataFrame(results)
+    return df[COLUMNS]
+
+
+def process_buffers(
+    buffers: Iterable[Tuple[str, bytes]],
+    session_id: str,
+    max_workers: int = 0,
+    on_result: Optional[Callable[[Dict], None]] = None,
+) -> "pd.DataFrame":
+    """
+    Parse in-memory files given as (file name, bytes) without touching disk.
+    With max_workers=0 (default) files are parsed inline in this process,
+    which avoids pool start-up and pickling and is fastest for small uploads.
+    """
+    import pandas as pd
+
+    buffers = [(name, data) for name, data in buffers if _is_parseable(name)]
+    if not buffers:
+        return pd.DataFrame(columns=COLUMNS)
+
+    if max_workers == 0:
+        records = (_process_buffer(data, name, session_id) for name, data in buffers)
+    else:
+        if max_workers is None:
+            import multiprocessing
+            max_workers = min(4, multiprocessing.cpu_count() or 1)
+        exe = ProcessPoolExecutor(max_workers=max_workers)
+        futures = [exe.submit(_process_buffer, data, name, session_id) for name, data in buffers]
+        exe.shutdown(wait=False)
+        records = (fut.result() for fut in futures)
 
     results = []
-    with ProcessPoolExecutor(max_workers=max_workers) as exe:
-        futures = {exe.submit(_process_single, f, session_id): f for f in files}
-        for fut in as_completed(futures):
-            results.append(fut.result())
+    for record in records:
+        if on_result is not None:
+            on_result(record)
+        results.append(record)
 
     df = pd.DataFrame(results)
-    return df[["file_name", "file_type", "content", "images", "error"]]
+    return df[COLUMNS]
+
+
+def format_record(record) -> str:
+    """
+    Text-output block for one parsed record (dict or DataFrame row).
+    """
+    header = f"=== {record['file_name']} ({record['file_type']}) ===\n"
+    if record["error"]:
+        return header + f"[ERROR] {record['error']}\n\n"
+    return header + str(record["content"]) + "\n\n"
 
 
-def save_parsed_data(parsed_data: pd.DataFrame, output_file: str = None) -> str:
+def save_parsed_data(parsed_data: "pd.DataFrame", output_file: str = None, output_dir: str = "outputs") -> str:
     """
     Write parsed text output.
     """
-    output_dir = "outputs"
     os.makedirs(output_dir, exist_ok=True)
 
     if not output_file:
@@ -100,11 +238,7 @@ def save_parsed_data(parsed_data: pd.DataFrame, output_file: str = None) -> str:
 
     buf = StringIO()
     for _, row in parsed_data.iterrows():
-        buf.write(f"=== {row['file_name']} ({row['file_type']}) ===\n")
-        if row["error"]:
-            buf.write(f"[ERROR] {row['error']}\n\n")
-            continue
-        buf.write(str(row["content"]) + "\n\n")
+        buf.write(format_record(row))
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(buf.getvalue())
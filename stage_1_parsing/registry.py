@@ -0,0 +1,160 @@
+# stage_1_parsing/registry.py
+"""
+Parser registry with lazy imports.
+
+Parsers are registered by extension as a "module:function" target and are
+only imported the first time a file of that type is parsed. Extra parsers
+can be added with the `register_parser` decorator or through the
+`files_parsing.parsers` entry-point group (name = extension, value =
+"module:function").
+
+A parser is called as parser(source, session_id=..., name=...), where
+source is a file path or an in-memory buffer (see sources.py) and name
+(optional) overrides the base name used for extracted image files. It
+returns (text content, list of saved image paths); paginated formats may
+add a third item, the list of page texts, used by the search index.
+
+Parsers with the original parser(file_path, session_id) signature keep
+working: they are wrapped so buffers are spilled to a temporary file and
+name is dropped.
+"""
+
+import os
+import inspect
+import tempfile
+import functools
+import importlib
+from typing import Callable, Dict, Iterator, Union
+
+from .sources import is_path, read_source
+
+ENTRY_POINT_GROUP = "files_parsing.parsers"
+
+_Target = Union[str, Callable]
+
+
+def _accepts_name(func: Callable) -> bool:
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(p.name == "name" or p.kind is p.VAR_KEYWORD for p in params)
+
+
+def _adapt(func: Callable) -> Callable:
+    """Wrap a parser(file_path, session_id) so it can be called like a built-in."""
+    if _accepts_name(func):
+        return func
+
+    @functools.wraps(func)
+    def call(source, session_id, name=None):
+        if is_path(source):
+            return func(source, session_id)
+
+        suffix = os.path.splitext(name or getattr(source, "name", "") or "")[1]
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(read_source(source))
+            return func(tmp_path, session_id)
+        finally:
+            os.remove(tmp_path)
+
+    return call
+
+
+class ParserRegistry:
+    """
+    Mapping of file extension -> parser callable, resolved on first use.
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, _Target] = {}
+        self._entry_points_loaded = False
+
+    # ---------------- registration ----------------
+    def register_lazy(self, ext: str, target: str) -> None:
+        """Register a parser by its "module:function" path without importing it."""
+        self._targets[ext.lower()] = target
+
+    def register(self, ext: str, func: Callable) -> None:
+        self._targets[ext.lower()] = _adapt(func)
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+
+        try:
+            from importlib.metadata import entry_points
+            eps = entry_points(group=ENTRY_POINT_GROUP)
+        except Exception:
+            return
+
+        for ep in eps:
+            ext = ep.name.lower()
+            if not ext.startswith("."):
+                ext = "." + ext
+            # built-ins and explicit registrations win over plugins
+            self._targets.setdefault(ext, ep.value)
+
+    # ---------------- lookup ----------------
+    def get(self, ext: str, default=None):
+        self._load_entry_points()
+        ext = ext.lower()
+        target = self._targets.get(ext)
+        if target is None:
+            return default
+        if callable(target):
+            return target
+
+        module_name, _, attr = target.partition(":")
+        func = _adapt(getattr(importlib.import_module(module_name), attr))
+        self._targets[ext] = func
+        return func
+
+    def __getitem__(self, ext: str) -> Callable:
+        func = self.get(ext)
+        if func is None:
+            raise KeyError(ext)
+        return func
+
+    def __contains__(self, ext) -> bool:
+        self._load_entry_points()
+        return isinstance(ext, str) and ext.lower() in self._targets
+
+    def __iter__(self) -> Iterator[str]:
+        self._load_entry_points()
+        return iter(list(self._targets))
+
+    def __len__(self) -> int:
+        self._load_entry_points()
+        return len(self._targets)
+
+    def extensions(self):
+        return list(self)
+
+
+PARSERS = ParserRegistry()
+
+PARSERS.register_lazy(".pdf", "stage_1_parsing.pdf_parser:parse_pdf")
+PARSERS.register_lazy(".docx", "stage_1_parsing.word_parser:parse_word")
+PARSERS.register_lazy(".doc", "stage_1_parsing.legacy_word_parser:parse_doc")
+PARSERS.register_lazy(".xlsx", "stage_1_parsing.excel_parser:parse_excel")
+PARSERS.register_lazy(".xls", "stage_1_parsing.legacy_excel_parser:parse_xls")
+
+
+def register_parser(*extensions: str):
+    """
+    Decorator registering a parser for one or more extensions.
+
+        @register_parser(".csv")
+        def parse_csv(file_path, session_id): ...
+
+    Parsers may also take `name=None` and in-memory sources (see above).
+    """
+    def decorator(func: Callable) -> Callable:
+        for ext in extensions:
+            PARSERS.register(ext, func)
+        return func
+    return decorator
@@ -0,0 +1,170 @@
+# stage_1_parsing/search_index.py
+"""
+Local full-text index (SQLite FTS5) over parsed content.
+
+Records are queued by `add()` and written by a background thread, so
+indexing never blocks the caller. Content is indexed per page: records
+carrying "pages" (PDF) are split on them, other documents are one page.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+# page metadata lives in a normal table so re-indexing a file is an index lookup
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_type TEXT,
+    page INTEGER
+);
+CREATE INDEX IF NOT EXISTS pages_file ON pages (session_id, file_name);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(content, tokenize = 'unicode61');
+"""
+
+_BATCH_SIZE = 200
+
+
+def _to_match_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word is quoted (implicit AND),
+    a trailing * keeps prefix matching.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # ---------------- writes (background) ----------------
+    def add(self, session_id: str, record: Dict) -> None:
+        """Queue a parsed record for indexing; returns immediately."""
+        if record.get("error") or not record.get("content"):
+            return
+        self._ensure_writer()
+        pages = record.get("pages") or [str(record["content"])]
+        self._queue.put((session_id, record["file_name"], record["file_type"], pages))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer, name="search-index", daemon=True)
+                self._thread.start()
+
+    def _writer(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with conn:
+                    for session_id, file_name, file_type, pages in batch:
+                        self._write(conn, session_id, file_name, file_type, pages)
+            except sqlite3.Error as e:
+                print(f"⚠️ Search index write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _write(conn, session_id, file_name, file_type, pages) -> None:
+        # re-parsing a file replaces its pages
+        old_ids = [
+            (row[0],) for row in conn.execute(
+                "SELECT id FROM pages WHERE session_id = ? AND file_name = ?",
+                (session_id, file_name),
+            )
+        ]
+        if old_ids:
+            conn.executemany("DELETE FROM documents WHERE rowid = ?", old_ids)
+            conn.executemany("DELETE FROM pages WHERE id = ?", old_ids)
+
+        for num, page in enumerate(pages, 1):
+            if not page.strip():
+                continue
+            cur = conn.execute(
+                "INSERT INTO pages (session_id, file_name, file_type, page) VALUES (?, ?, ?, ?)",
+                (session_id, file_name, file_type, num),
+            )
+            conn.execute(
+                "INSERT INTO documents (rowid, content) VALUES (?, ?)",
+                (cur.lastrowid, page),
+            )
+
+    # ---------------- reads ----------------
+    def search(self, query: str, session_id: str = None, limit: int = 20) -> List[Dict]:
+        """
+        Return hits ranked by bm25 with highlighted snippets.
+        """
+        match = _to_match_query(query)
+        if not match:
+            return []
+
+        sql = (
+            "SELECT p.session_id, p.file_name, p.file_type, p.page, "
+            "snippet(documents, 0, '[', ']', '…', 16), bm25(documents) AS score "
+            "FROM documents JOIN pages p ON p.id = documents.rowid "
+            "WHERE documents MATCH ?"
+        )
+        params: list = [match]
+        if session_id:
+            sql += " AND p.session_id = ?"
+            params.append(session_id)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            {
+                "session_id": r[0],
+                "file_name": r[1],
+                "file_type": r[2],
+                "page": r[3],
+                "snippet": r[4],
+                "score": -r[5],
+            }
+            for r in rows
+        ]
@@ -0,0 +1,57 @@
+# stage_1_parsing/sources.py
+"""
+Helpers letting parsers take either a file path or an in-memory buffer
+(bytes / bytearray / memoryview / binary file-like object).
+"""
+
+import os
+from io import BytesIO
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+def is_path(source: Source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def source_name(source: Source, name: str = None) -> str:
+    """Base name used for reporting and image file names."""
+    if name:
+        return os.path.basename(name)
+    if is_path(source):
+        return os.path.basename(os.fspath(source))
+    return os.path.basename(getattr(source, "name", "") or "upload")
+
+
+@contextmanager
+def open_source(source: Source) -> Iterator[BinaryIO]:
+    """Yield a seekable binary file object positioned at the start."""
+    if is_path(source):
+        with open(source, "rb") as fh:
+            yield fh
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+
+def image_dir(kind: str, session_id: str) -> str:
+    """
+    Folder for extracted images, e.g. Outputs/pdf_images/<session_id>.
+    The root can be moved with the PARSED_IMAGES_ROOT environment variable.
+    """
+    path = os.path.join(os.getenv("PARSED_IMAGES_ROOT", "Outputs"), f"{kind}_images", session_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def read_source(source: Source) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    with open_source(source) as fh:
+        return fh.read()
@@ -1,40 +1,154 @@
 # stage_1_parsing/word_parser.py
 
-from docx import Document
 import os
-from typing import List, Tuple
+import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Tuple
 
-def parse_word(file_path: str, session_id: str) -> Tuple[str, List[str]]:
+from .sources import Source, image_dir, open_source, source_name
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_BODY = _W + "body"
+_P = _W + "p"
+_R = _W + "r"
+_T = _W + "t"
+_TAB = _W + "tab"
+_BR = _W + "br"
+_CR = _W + "cr"
+_TBL = _W + "tbl"
+_TR = _W + "tr"
+_TC = _W + "tc"
+_GRID_SPAN = _W + "gridSpan"
+_V_MERGE = _W + "vMerge"
+_VAL = _W + "val"
+
+
+class _Table:
+    def __init__(self, elem):
+        self.elem = elem
+        self.row: List[str] = []
+        self.col = 0
+        self.cell: List[str] = []
+        self.span = 1
+        self.v_merge = None
+        # text of vertically merged cells by grid column
+        self.merged = {}
+
+
+def _iter_blocks(xml_file) -> Iterator[str]:
+    """
+    Stream document.xml and yield paragraphs and table rows in document order.
+    Table rows are cell texts joined by commas; merged cells repeat their text.
+    """
+    body = None
+    paragraphs: List[List[str]] = []
+    tables: List[_Table] = []
+    in_run = 0
+    in_fallback = 0
+
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        tag = elem.tag
+
+        if event == "start":
+            if tag == _MC_FALLBACK:
+                # mc:Fallback duplicates the mc:Choice content (e.g. text boxes)
+                in_fallback += 1
+            elif tag == _R:
+                in_run += 1
+            elif in_fallback:
+                pass
+            elif tag == _P:
+                paragraphs.append([])
+            elif tag == _TBL:
+                tables.append(_Table(elem))
+            elif tag == _TC and tables:
+                table = tables[-1]
+                table.cell, table.span, table.v_merge = [], 1, None
+            elif tag == _BODY:
+                body = elem
+            continue
+
+        if tag == _MC_FALLBACK:
+            in_fallback -= 1
+        elif tag == _R:
+            in_run -= 1
+        elif in_fallback:
+            # nothing inside the fallback was pushed, so nothing is popped
+            pass
+        elif tag == _T and paragraphs:
+            paragraphs[-1].append(elem.text or "")
+        elif tag == _TAB and in_run and paragraphs:
+            paragraphs[-1].append("\t")
+        elif tag in (_BR, _CR) and in_run and paragraphs:
+            paragraphs[-1].append("\n")
+        elif tag == _P and paragraphs:
+            text = "".join(paragraphs.pop()).strip()
+            if tables and not paragraphs:
+                tables[-1].cell.append(text)
+            elif text:
+                yield text
+        elif tag == _GRID_SPAN and tables:
+            try:
+                tables[-1].span = max(1, int(elem.get(_VAL, "1")))
+            except ValueError:
+                pass
+        elif tag == _V_MERGE and tables:
+            tables[-1].v_merge = elem.get(_VAL, "continue")
+        elif tag == _TC and tables:
+            table = tables[-1]
+            text = "\n".join(table.cell).strip()
+            if table.v_merge == "continue":
+                text = table.merged.get(table.col, "")
+            elif table.v_merge == "restart":
+                table.merged[table.col] = text
+            else:
+                table.merged.pop(table.col, None)
+            table.row.extend([text] * table.span)
+            table.col += table.span
+        elif tag == _TR and tables:
+            table = tables[-1]
+            yield ",".join(table.row)
+            table.row, table.col = [], 0
+            # detach finished rows so a long table doesn't stay in memory
+            elem.clear()
+            table.elem.remove(elem)
+        elif tag == _TBL and tables:
+            tables.pop()
+            if tables:
+                elem.clear()
+
+        # drop finished top-level blocks so memory stays flat
+        if tag in (_P, _TBL) and body is not None and not (paragraphs or tables or in_fallback):
+            body.clear()
+
+
+def parse_word(file_path: Source, session_id: str, name: str = None) -> Tuple[str, List[str]]:
+    """
+    Parse a .docx by streaming word/document.xml straight out of the zip.
+    """
     paragraphs = []
     saved_images = []
+    base = source_name(file_path, name)
+
+    images_dir = image_dir("word", session_id)
+
+    with open_source(file_path) as raw, zipfile.ZipFile(raw) as zf:
+        # extract text and table rows in document order
+        with zf.open("word/document.xml") as xml_file:
+            paragraphs.extend(_iter_blocks(xml_file))
 
-    images_dir = os.path.join("Outputs", "word_images", session_id)
-    os.makedirs(images_dir, exist_ok=True)
-
-    doc = Document(file_path)
-
-    # extract text
-    for p in doc.paragraphs:
-        tx = p.text.strip()
-        if tx:
-            paragraphs.append(tx)
-
-    # extract tables
-    for table in doc.tables:
-        for row in table.rows:
-            paragraphs.append(",".join([c.text.strip() for c in row.cells]))
-
-    # extract inline images
-    rels = doc.part.rels
-    for rel in rels:
-        rel_obj = rels[rel]
-        if "image" in rel_obj.target_ref:
-            img_bytes = rel_obj.target_part.blob
-            img_name = os.path.basename(rel_obj.target_ref)
+        # extract images
+        for info in zf.infolist():
+            if not info.filename.startswith("word/media/") or info.is_dir():
+                continue
+            img_name = f"{base}_{os.path.basename(info.filename)}"
             img_path = os.path.join(images_dir, img_name)
 
-            with open(img_path, "wb") as fh:
-                fh.write(img_bytes)
+            with zf.open(info) as src, open(img_path, "wb") as fh:
+                shutil.copyfileobj(src, fh)
 
             saved_images.append(img_path)
 
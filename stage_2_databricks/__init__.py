@@ -1,19 +1,22 @@
 # stage_2_databricks/__init__.py
 """
 Clean initializer for Databricks utilities.
-Only exposes functions that actually exist in db_utils.py
+Only exposes functions that actually exist in db_utils.py.
+db_utils (and the Databricks connector) is imported on first attribute access.
 """
 
-from .db_utils import (
-    upload_parsed_records,
-    list_tables,
-    preview_table,
-    drop_table
-)
+import importlib
 
 __all__ = [
     "upload_parsed_records",
+    "bulk_upload_parsed_records",
     "list_tables",
     "preview_table",
     "drop_table"
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return getattr(importlib.import_module(".db_utils", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
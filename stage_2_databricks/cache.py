@@ -0,0 +1,152 @@
+# stage_2_databricks/cache.py
+"""
+Small in-process TTL cache for warehouse metadata and previews.
+
+- Fresh entries are served directly.
+- Stale entries (past ttl, within stale_ttl) are served immediately while
+  one background thread refreshes them.
+- Concurrent misses for the same key share a single in-flight load.
+- invalidate() drops entries and discards loads that started before it.
+- With a shared_path, invalidate() also touches a stamp file; every process
+  using the same path drops all of its entries on its next read, so gunicorn
+  workers on one host never serve data from before an invalidation.
+  Processes on other hosts are still bounded only by ttl / stale_ttl.
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "loaded_at")
+
+    def __init__(self, value, loaded_at):
+        self.value = value
+        self.loaded_at = loaded_at
+
+
+class TTLCache:
+    def __init__(self, ttl: float = 60, stale_ttl: float = 600, shared_path: str = None):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.shared_path = shared_path
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._generation: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self._stamp = self._read_stamp()
+
+    # ---------------- shared invalidation ----------------
+    def _read_stamp(self):
+        if not self.shared_path:
+            return None
+        try:
+            st = os.stat(self.shared_path)
+        except FileNotFoundError:
+            return None
+        # the stamp is replaced on every write, so the inode changes too
+        return st.st_ino, st.st_mtime_ns
+
+    def _write_stamp(self) -> None:
+        tmp = f"{self.shared_path}.{uuid.uuid4().hex}"
+        with open(tmp, "w") as fh:
+            fh.write(uuid.uuid4().hex)
+        os.replace(tmp, self.shared_path)
+
+    def _sync(self) -> None:
+        """Drop everything if another process invalidated since the last read."""
+        if not self.shared_path:
+            return
+        stamp = self._read_stamp()
+        with self._lock:
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self._drop(None)
+
+    # ---------------- reads ----------------
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.loaded_at
+            if age < self.ttl:
+                return entry.value
+            if age < self.stale_ttl:
+                self.refresh(key, loader)
+                return entry.value
+        return self._load(key, loader).result()
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else entry.value
+
+    # ---------------- loads ----------------
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Future:
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut
+            fut = Future()
+            self._inflight[key] = fut
+            generation = self._generation.get(key, 0)
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._release(key, fut)
+            fut.set_exception(e)
+            return fut
+
+        with self._lock:
+            self._release(key, fut)
+            # an invalidate() during the load means this value may be outdated
+            if self._generation.get(key, 0) == generation:
+                self._entries[key] = _Entry(value, time.monotonic())
+        fut.set_result(value)
+        return fut
+
+    def _release(self, key: Hashable, fut: Future) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+
+    def refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        """Reload key in a background thread (no-op if a load is already running)."""
+        with self._lock:
+            if key in self._inflight:
+                return
+
+        def run():
+            try:
+                self._load(key, loader).result()
+            except Exception as e:
+                print(f"⚠️ Background refresh of {key!r} failed: {e}")
+
+        threading.Thread(target=run, name=f"cache-refresh-{key}", daemon=True).start()
+
+    # ---------------- invalidation ----------------
+    def invalidate(self, key: Hashable = None) -> None:
+        """
+        Drop one key (or everything when key is None). Other processes sharing
+        shared_path drop all their entries, since the stamp carries no key.
+        """
+        with self._lock:
+            self._drop(key)
+            if self.shared_path:
+                self._write_stamp()
+                self._stamp = self._read_stamp()
+
+    def _drop(self, key: Hashable) -> None:
+        keys = list(self._entries) + list(self._inflight) if key is None else [key]
+        for k in keys:
+            self._entries.pop(k, None)
+            # loads already running finish for their callers but aren't stored
+            self._inflight.pop(k, None)
+            self._generation[k] = self._generation.get(k, 0) + 1
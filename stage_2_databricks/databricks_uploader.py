@@ -1,6 +1,9 @@
 # stage_2_databricks/databricks_uploader.py
 import os
-from .db_utils import upload_parsed_records, write_to_databricks, init_spark
+import shutil
+from .db_utils import (
+    upload_parsed_records, write_parquet_batch, write_to_databricks, init_spark, LOCAL_STAGING_DIR
+)
 
 def upload_parsed_output_cli():
     outputs_dir = "outputs"
@@ -30,18 +33,23 @@ def upload_parsed_output_cli():
             content = fh.read()
         to_upload.append({"file_name": fn, "file_type": os.path.splitext(fn)[1].lower(), "content": content})
 
-    # prefer SQL connector for small sets; for large sets recommend Spark path:
+    # SQL connector (large sets go through Parquet + MERGE when a staging volume is set); Spark as fallback:
+    # no namespace: ids cover the content, so re-uploading a regenerated
+    # outputs file adds rows instead of overwriting the previous run
     try:
         upload_parsed_records(to_upload)
     except Exception as e:
-        print("Connector upload failed; attempting Spark fallback.")
+        print(f"Connector upload failed ({e}); attempting Spark fallback.")
         spark = init_spark()
         if spark:
-            # write each file as a simple text table via write_to_databricks fallback
-            for fn in selected:
-                p = os.path.join(outputs_dir, fn)
-                write_to_databricks(spark, p, table_name="parsed_files")
-            spark.stop()
+            # stage everything as one Parquet batch and append it in a single Spark write
+            staging = os.path.join(LOCAL_STAGING_DIR, "spark_fallback")
+            write_parquet_batch(to_upload, staging)
+            try:
+                write_to_databricks(spark, staging, table_name="parsed_files")
+            finally:
+                spark.stop()
+                shutil.rmtree(staging, ignore_errors=True)
 
 if __name__ == "__main__":
     upload_parsed_output_cli()
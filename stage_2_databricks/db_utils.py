@@ -3,16 +3,15 @@ Databricks helpers for SQL connector-based operations.
 """
 
 import os
+import uuid
+import functools
+import hashlib
+import shutil
 from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    from databricks import sql
-except ImportError:
-    sql = None
-
 
 # --------------------------------------------------------------------
 # Connection Info
@@ -21,22 +20,38 @@ DATABRICKS_SERVER = os.getenv("DATABRICKS_SERVER")
 DATABRICKS_HTTP_PATH = os.getenv("DATABRICKS_HTTP_PATH")
 DATABRICKS_TOKEN = os.getenv("DATABRICKS_TOKEN")
 
-if not DATABRICKS_TOKEN:
-    raise EnvironmentError("❌ Missing DATABRICKS_TOKEN in .env")
+# Bulk loads: above this many records, rows are staged as Parquet and
+# merged with a single statement instead of batched VALUES MERGEs.
+BULK_LOAD_THRESHOLD = int(os.getenv("DATABRICKS_BULK_THRESHOLD", "1000"))
+BULK_ROWS_PER_FILE = int(os.getenv("DATABRICKS_BULK_ROWS_PER_FILE", "50000"))
+# Unity Catalog volume the Parquet files are PUT into, e.g. /Volumes/main/default/staging.
+# The warehouse can't read the client's disk, so bulk loads need this set;
+# without it uploads always use the batched path.
+DATABRICKS_STAGING_VOLUME = os.getenv("DATABRICKS_STAGING_VOLUME")
+LOCAL_STAGING_DIR = os.getenv("DATABRICKS_LOCAL_STAGING", "/tmp/databricks_staging")
+
 
+def get_conn(**kwargs):
+    """Create Databricks SQL connection (the connector is imported on first use)."""
+    if not DATABRICKS_TOKEN:
+        raise EnvironmentError("❌ Missing DATABRICKS_TOKEN in .env")
+
+    from databricks import sql
 
-def get_conn():
-    """Create Databricks SQL connection."""
     return sql.connect(
         server_hostname=DATABRICKS_SERVER,
         http_path=DATABRICKS_HTTP_PATH,
-        access_token=DATABRICKS_TOKEN
+        access_token=DATABRICKS_TOKEN,
+        **kwargs
     )
 
 
 # --------------------------------------------------------------------
 # Detect Active Catalog + Schema
 # --------------------------------------------------------------------
+# The connection's default catalog/schema doesn't change while the process
+# runs, so it is resolved once instead of costing an extra connection per call.
+@functools.lru_cache(maxsize=1)
 def detect_namespace():
     conn = get_conn()
     cur = conn.cursor()
@@ -51,19 +66,31 @@ def detect_namespace():
 
 
 # --------------------------------------------------------------------
-# Upload Parsed Records
+# Upload Parsed Records (idempotent MERGE on doc_id)
 # --------------------------------------------------------------------
-def upload_parsed_records(file_records, table_name="parsed_files"):
-    catalog, schema = detect_namespace()
-
-    full_table = f"{catalog}.{schema}.{table_name}"
+MERGE_BATCH_ROWS = 200
+
+_IDENTITY_COLUMNS = ("doc_id", "content_hash")
+_COLUMNS = ("doc_id", "content_hash", "file_name", "file_type", "content", "parsed_at")
+
+_MERGE_ACTIONS = """
+    ON t.doc_id = s.doc_id
+    WHEN MATCHED AND NOT (t.content_hash <=> s.content_hash) THEN UPDATE SET
+        t.content_hash = s.content_hash,
+        t.file_name = s.file_name,
+        t.file_type = s.file_type,
+        t.content = s.content,
+        t.parsed_at = s.parsed_at
+    WHEN NOT MATCHED THEN INSERT (doc_id, content_hash, file_name, file_type, content, parsed_at)
+        VALUES (s.doc_id, s.content_hash, s.file_name, s.file_type, s.content, s.parsed_at)
+"""
 
-    conn = get_conn()
-    cur = conn.cursor()
 
-    # Create table if missing
+def _ensure_table(cur, full_table):
     cur.execute(f"""
         CREATE TABLE IF NOT EXISTS {full_table} (
+            doc_id STRING,
+            content_hash STRING,
             file_name STRING,
             file_type STRING,
             content STRING,
@@ -71,21 +98,253 @@ def upload_parsed_records(file_records, table_name="parsed_files"):
         )
     """)
 
-    insert_query = f"""
-        INSERT INTO {full_table}
-        (file_name, file_type, content, parsed_at)
-        VALUES (?, ?, ?, ?)
+    # tables created before doc_id/content_hash existed get the columns added
+    cur.execute(f"SELECT * FROM {full_table} LIMIT 0")
+    cur.fetchall()
+    existing = {c[0].lower() for c in cur.description}
+    missing = [c for c in _IDENTITY_COLUMNS if c not in existing]
+    if missing:
+        cols = ", ".join(f"{c} STRING" for c in missing)
+        cur.execute(f"ALTER TABLE {full_table} ADD COLUMNS ({cols})")
+
+
+def _sql_path(path):
+    return path.replace("'", "''")
+
+
+def document_id(file_name, file_type, namespace=None, content_digest=None):
     """
+    Stable id of a document.
 
-    now = datetime.utcnow().isoformat(" ")
-    rows = [(r["file_name"], r["file_type"], r["content"], now) for r in file_records]
+    With a namespace (e.g. a session id or source path) the same name + type
+    within it maps to one row, so re-uploads update in place. Without one the
+    id also covers the content: identical re-uploads are skipped and a
+    different document with the same name gets its own row.
+
+    Rows written before namespaces existed have doc_id = sha256(type, name);
+    they are never matched by these ids, so they stay untouched and a
+    re-upload of the same document adds a new row next to them.
+    """
+    if namespace is not None:
+        key = f"{namespace}\0{file_type}\0{file_name}"
+    else:
+        key = f"{file_type}\0{file_name}\0{content_digest}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def content_hash(content):
+    return hashlib.sha256(str(content).encode("utf-8")).hexdigest()
+
+
+def prepare_records(file_records, namespace=None):
+    """
+    Attach content_hash/doc_id (unless the caller supplied them) and keep
+    only the last record per doc_id, since MERGE rejects duplicate sources.
+    """
+    by_id = {}
+    for r in file_records:
+        rec = dict(r)
+        rec.setdefault("content_hash", content_hash(rec["content"]))
+        rec.setdefault(
+            "doc_id",
+            document_id(rec["file_name"], rec["file_type"], namespace, rec["content_hash"]),
+        )
+        by_id.pop(rec["doc_id"], None)
+        by_id[rec["doc_id"]] = rec
+    return list(by_id.values())
+
+
+def _merge_counts(cur):
+    """(inserted, updated) from the MERGE result row."""
+    rows = cur.fetchall()
+    if not rows or not cur.description:
+        return 0, 0
+    stats = dict(zip([c[0] for c in cur.description], rows[0]))
+    return int(stats.get("num_inserted_rows") or 0), int(stats.get("num_updated_rows") or 0)
+
+
+def _summary(full_table, total, inserted, updated):
+    summary = {
+        "table": full_table,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": total - inserted - updated,
+    }
+    print(
+        f"✅ {full_table}: {inserted} inserted, {updated} updated, "
+        f"{summary['skipped']} unchanged/duplicate skipped"
+    )
+    return summary
+
+
+def upload_parsed_records(file_records, table_name="parsed_files", namespace=None):
+    """
+    Upsert records on doc_id: new documents are inserted, changed ones
+    updated and unchanged ones skipped. Returns inserted/updated/skipped counts.
+    namespace scopes document ids (see document_id).
+    Large sets go through bulk_upload_parsed_records when a staging volume is set.
+    """
+    if DATABRICKS_STAGING_VOLUME and len(file_records) >= BULK_LOAD_THRESHOLD:
+        return bulk_upload_parsed_records(file_records, table_name=table_name, namespace=namespace)
+
+    catalog, schema = detect_namespace()
 
-    cur.executemany(insert_query, rows)
+    full_table = f"{catalog}.{schema}.{table_name}"
+
+    records = prepare_records(file_records, namespace)
+
+    conn = get_conn()
+    cur = conn.cursor()
+
+    # Create table if missing
+    _ensure_table(cur, full_table)
+
+    now = datetime.utcnow().isoformat(" ")
+    inserted = updated = 0
+
+    # one MERGE per chunk instead of one statement per row
+    for start in range(0, len(records), MERGE_BATCH_ROWS):
+        chunk = records[start:start + MERGE_BATCH_ROWS]
+        values = ", ".join(["(?, ?, ?, ?, ?, ?)"] * len(chunk))
+        params = []
+        for r in chunk:
+            params.extend([r["doc_id"], r["content_hash"], r["file_name"], r["file_type"], str(r["content"]), now])
+
+        cur.execute(f"""
+            MERGE INTO {full_table} AS t
+            USING (
+                SELECT doc_id, content_hash, file_name, file_type, content,
+                       CAST(parsed_at AS TIMESTAMP) AS parsed_at
+                FROM VALUES {values} AS v({", ".join(_COLUMNS)})
+            ) AS s
+            {_MERGE_ACTIONS}
+        """, params)
+        ins, upd = _merge_counts(cur)
+        inserted += ins
+        updated += upd
 
     cur.close()
     conn.close()
 
-    print(f"✅ Uploaded {len(rows)} rows into {full_table}")
+    return _summary(full_table, len(file_records), inserted, updated)
+
+
+# --------------------------------------------------------------------
+# Bulk Upload (Parquet + MERGE)
+# --------------------------------------------------------------------
+def write_parquet_batch(file_records, out_dir, rows_per_file=BULK_ROWS_PER_FILE, namespace=None):
+    """
+    Write records as zstd-compressed Parquet part files; returns the file paths.
+    """
+    import pandas as pd
+
+    os.makedirs(out_dir, exist_ok=True)
+    now = pd.Timestamp(datetime.utcnow())
+    records = prepare_records(file_records, namespace)
+
+    paths = []
+    for part, start in enumerate(range(0, len(records), rows_per_file)):
+        chunk = records[start:start + rows_per_file]
+        df = pd.DataFrame({
+            "doc_id": [r["doc_id"] for r in chunk],
+            "content_hash": [r["content_hash"] for r in chunk],
+            "file_name": [r["file_name"] for r in chunk],
+            "file_type": [r["file_type"] for r in chunk],
+            "content": [str(r["content"]) for r in chunk],
+            "parsed_at": [now] * len(chunk),
+        })
+        path = os.path.join(out_dir, f"part-{part:05d}.parquet")
+        # Databricks reads microsecond timestamps
+        df.to_parquet(
+            path, engine="pyarrow", compression="zstd", index=False,
+            coerce_timestamps="us", allow_truncated_timestamps=True
+        )
+        paths.append(path)
+    return paths
+
+
+def bulk_upload_parsed_records(file_records, table_name="parsed_files", namespace=None):
+    """
+    Stage records as Parquet, PUT them into DATABRICKS_STAGING_VOLUME and
+    upsert them with one MERGE statement.
+    """
+    if not DATABRICKS_STAGING_VOLUME:
+        raise EnvironmentError(
+            "❌ Bulk loads need DATABRICKS_STAGING_VOLUME (e.g. /Volumes/main/default/staging); "
+            "the warehouse can't read local staging files"
+        )
+
+    catalog, schema = detect_namespace()
+    full_table = f"{catalog}.{schema}.{table_name}"
+
+    batch_id = uuid.uuid4().hex
+    local_dir = os.path.join(LOCAL_STAGING_DIR, batch_id)
+    part_files = write_parquet_batch(file_records, local_dir, namespace=namespace)
+
+    conn = get_conn(staging_allowed_local_path=LOCAL_STAGING_DIR)
+    cur = conn.cursor()
+
+    remote_files = []
+    try:
+        _ensure_table(cur, full_table)
+
+        source = f"{DATABRICKS_STAGING_VOLUME.rstrip('/')}/{batch_id}"
+        for path in part_files:
+            remote = f"{source}/{os.path.basename(path)}"
+            cur.execute(f"PUT '{_sql_path(path)}' INTO '{_sql_path(remote)}' OVERWRITE")
+            remote_files.append(remote)
+
+        cur.execute(f"""
+            MERGE INTO {full_table} AS t
+            USING (SELECT * FROM parquet.`{source}`) AS s
+            {_MERGE_ACTIONS}
+        """)
+        inserted, updated = _merge_counts(cur)
+    finally:
+        for remote in remote_files:
+            try:
+                cur.execute(f"REMOVE '{_sql_path(remote)}'")
+            except Exception:
+                pass
+        cur.close()
+        conn.close()
+        shutil.rmtree(local_dir, ignore_errors=True)
+
+    return _summary(full_table, len(file_records), inserted, updated)
+
+
+# --------------------------------------------------------------------
+# Spark Fallback (databricks-connect or a local Spark session)
+# --------------------------------------------------------------------
+def init_spark(app_name="FilesParsingUpload"):
+    """Return a SparkSession, or None when pyspark is not installed."""
+    try:
+        from pyspark.sql import SparkSession
+    except ImportError:
+        print("⚠️ pyspark not installed; Spark fallback unavailable.")
+        return None
+    return SparkSession.builder.appName(app_name).getOrCreate()
+
+
+def write_to_databricks(spark, path, table_name="parsed_files"):
+    """
+    Append a Parquet file/dir (from write_parquet_batch) or a parsed text
+    output file to a table through Spark.
+    """
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        df = spark.read.parquet(path)
+    else:
+        from pyspark.sql import functions as F
+
+        with open(path, "r", encoding="utf-8") as fh:
+            content = fh.read()
+        df = spark.createDataFrame(
+            [(os.path.basename(path), os.path.splitext(path)[1].lower(), content)],
+            "file_name string, file_type string, content string",
+        ).withColumn("parsed_at", F.current_timestamp())
+
+    df.write.mode("append").saveAsTable(table_name)
+    print(f"✅ Spark wrote {path} into {table_name}")
 
 
 # --------------------------------------------------------------------
@@ -0,0 +1,76 @@
+# tests/test_archives.py
+"""
+Archive streaming limits.
+"""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from stage_1_parsing import archives
+from stage_1_parsing.archives import ArchiveLimitError, iter_archive_members
+
+
+class _Zeros(io.RawIOBase):
+    def __init__(self, size):
+        self.left = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.left)
+        b[:n] = bytes(n)
+        self.left -= n
+        return n
+
+
+def _tar_gz(path, members):
+    with tarfile.open(path, "w:gz") as tf:
+        for name, size in members:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            tf.addfile(info, io.BufferedReader(_Zeros(size)))
+
+
+def test_members_are_streamed(tmp_path):
+    path = tmp_path / "docs.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("a.pdf", b"%PDF-1.4 a")
+        zf.writestr("skip.txt", b"ignored")
+        zf.writestr("sub/b.docx", b"PK b")
+    members = list(iter_archive_members(str(path), lambda n: n.endswith((".pdf", ".docx"))))
+    assert members == [("a.pdf", b"%PDF-1.4 a"), ("sub/b.docx", b"PK b")]
+
+
+def test_tar_ratio_checked_before_extracting(tmp_path, monkeypatch):
+    path = tmp_path / "bomb.tar.gz"
+    _tar_gz(path, [("big.pdf", 20 * 1024 * 1024)])
+
+    read_sizes = []
+    real_extract = tarfile.TarFile.extractfile
+
+    def spy(self, member):
+        fh = real_extract(self, member)
+        read = fh.read
+        fh.read = lambda size=-1: read_sizes.append(size) or read(size)
+        return fh
+
+    monkeypatch.setattr(tarfile.TarFile, "extractfile", spy)
+    with pytest.raises(ArchiveLimitError, match="ratio"):
+        list(iter_archive_members(str(path), lambda n: True))
+    assert read_sizes == []
+
+
+def test_tar_read_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(archives, "MAX_ARCHIVE_TOTAL_BYTES", 1500)
+    path = tmp_path / "docs.tar"
+    with tarfile.open(path, "w") as tf:
+        for name in ("a.pdf", "b.pdf"):
+            info = tarfile.TarInfo(name)
+            info.size = 1000
+            tf.addfile(info, io.BytesIO(b"x" * 1000))
+    with pytest.raises(ArchiveLimitError, match="expands"):
+        list(iter_archive_members(str(path), lambda n: True))
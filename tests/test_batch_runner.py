@@ -0,0 +1,80 @@
+# tests/test_batch_runner.py
+"""
+Sharded batch runner: shard assignment, image paths and merging.
+"""
+
+import json
+import os
+import zipfile
+
+import pytest
+
+from stage_1_parsing.batch_runner import main, merge_shards, run_shard, shard_files, shard_of
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+_DOC = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body><w:p><w:r><w:t>{}</w:t></w:r></w:p></w:body></w:document>"
+)
+
+
+def _docx(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", _DOC.format(text))
+        zf.writestr("word/media/image1.png", PNG)
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "docs"
+    _docx(root / "a" / "report.docx", "from a")
+    _docx(root / "b" / "report.docx", "from b")
+    _docx(root / "c.docx", "top level")
+    (root / "notes.txt").write_text("not parseable", encoding="utf-8")
+    return root
+
+
+def test_every_file_in_exactly_one_shard(root):
+    for n in (1, 2, 3, 5):
+        shards = [shard_files(str(root), i, n) for i in range(n)]
+        assigned = sorted(f for shard in shards for f in shard)
+        assert assigned == sorted(shard_files(str(root), 0, 1))
+        assert len(assigned) == 3
+    assert shard_of("a/report.docx", 7) == shard_of(os.path.join("a", "report.docx"), 7)
+
+
+def test_run_shard_images_relative_to_out(root, tmp_path, monkeypatch):
+    monkeypatch.delenv("PARSED_IMAGES_ROOT", raising=False)
+    out = tmp_path / "out"
+    manifest = run_shard(str(root), str(out), max_workers=1)
+    assert manifest["files"] == 3 and manifest["errors"] == 0
+    assert "PARSED_IMAGES_ROOT" not in os.environ
+
+    with open(out / manifest["output"], encoding="utf-8") as fh:
+        records = {r["source"]: r for r in map(json.loads, fh)}
+    assert records[os.path.join("a", "report.docx")]["content"] == "from a"
+
+    images = [p for r in records.values() for p in r["images"]]
+    assert len(images) == len(set(images)) == 3
+    for p in images:
+        assert not os.path.isabs(p) and p.startswith("images" + os.sep)
+        assert (out / p).is_file()
+
+
+def test_merge_reports_missing_shards(root, tmp_path):
+    out = tmp_path / "out"
+    late = shard_of("c.docx", 3)
+    for i in range(3):
+        if i != late:
+            run_shard(str(root), str(out), shard_index=i, shard_count=3, max_workers=1)
+
+    merged = merge_shards(str(out))
+    assert merged["shards_missing"] == [late]
+    assert main(["merge", "--out", str(out)]) == 1
+
+    run_shard(str(root), str(out), shard_index=late, shard_count=3, max_workers=1)
+    assert main(["merge", "--out", str(out)]) == 0
+    with open(out / "merged.jsonl", encoding="utf-8") as fh:
+        assert len(fh.readlines()) == 3
@@ -0,0 +1,55 @@
+# tests/test_cache.py
+"""
+TTLCache: coalescing, invalidation and the shared stamp used across workers.
+"""
+
+import threading
+import time
+
+from stage_2_databricks.cache import TTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    cache = TTLCache(ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", loader))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == ["value"] * 5 and len(calls) == 1
+
+
+def test_invalidate_reloads():
+    cache = TTLCache(ttl=60)
+    assert cache.get("k", lambda: 1) == 1
+    assert cache.get("k", lambda: 2) == 1
+    cache.invalidate("k")
+    assert cache.get("k", lambda: 3) == 3
+
+
+def test_shared_stamp_invalidates_other_instances(tmp_path):
+    stamp = str(tmp_path / "cache.stamp")
+    worker_a = TTLCache(ttl=60, shared_path=stamp)
+    worker_b = TTLCache(ttl=60, shared_path=stamp)
+
+    assert worker_a.get("tables", lambda: ["t1"]) == ["t1"]
+    assert worker_b.get("tables", lambda: ["t1"]) == ["t1"]
+
+    worker_a.invalidate("tables")
+    assert worker_b.peek("tables") is None
+    assert worker_b.get("tables", lambda: []) == []
+
+    # the invalidating instance keeps what it loads after its own invalidation
+    assert worker_a.get("tables", lambda: []) == []
+    assert worker_a.peek("tables") == []
@@ -0,0 +1,221 @@
+# tests/test_legacy_parsers.py
+"""
+Regression tests for the pure-python .xls/.doc readers and the streaming
+DOCX parser: bundled samples plus small synthetic inputs.
+"""
+
+import io
+import os
+import struct
+import zipfile
+
+import pytest
+
+from stage_1_parsing.filetype import sniff_type
+from stage_1_parsing.legacy_excel_parser import (
+    _SegmentReader, _decode_rk, _format_number, _is_date_format, parse_xls,
+)
+from stage_1_parsing.legacy_office import OleError, OleFile, extract_blips
+from stage_1_parsing.legacy_word_parser import _strip_fields, _to_paragraphs, parse_doc
+from stage_1_parsing.word_parser import _iter_blocks, parse_word
+
+FILES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "files")
+SAMPLE_XLS = os.path.join(FILES, "Excel", "sample_1.xls")
+SAMPLE_DOC = os.path.join(FILES, "Word", "sample_2.doc")
+SAMPLE_DOCX = os.path.join(FILES, "Word", "sample_1.docx")
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+
+@pytest.fixture(autouse=True)
+def _images_in_tmp(tmp_path, monkeypatch):
+    # parsers write extracted images under ./Outputs
+    monkeypatch.chdir(tmp_path)
+
+
+# --------------------------------------------------------------------
+# Bundled samples
+# --------------------------------------------------------------------
+def test_sample_xls_first_rows():
+    text, images = parse_xls(SAMPLE_XLS, "s")
+    lines = text.splitlines()
+    assert lines[0] == "0,First Name,Last Name,Gender,Country,Age,Date,Id"
+    assert lines[1] == "1,Dulce,Abril,Female,United States,32,15/10/2017,1562"
+    assert images == []
+
+
+def test_sample_xls_from_buffer_matches_path():
+    with open(SAMPLE_XLS, "rb") as fh:
+        data = fh.read()
+    assert parse_xls(data, "s", name="sample_1.xls")[0] == parse_xls(SAMPLE_XLS, "s")[0]
+
+
+def test_sample_doc_text_and_image():
+    text, images = parse_doc(SAMPLE_DOC, "s")
+    assert text.startswith("Lorem ipsum\n\nLorem ipsum dolor sit amet, consectetur adipiscing elit.")
+    assert len(images) == 1 and images[0].endswith("sample_2.doc_1.jpeg")
+    with open(images[0], "rb") as fh:
+        assert fh.read(3) == b"\xff\xd8\xff"
+
+
+def test_sample_doc_and_docx_share_text():
+    doc_text = parse_doc(SAMPLE_DOC, "s")[0]
+    docx_text = parse_word(SAMPLE_DOCX, "s")[0]
+    assert doc_text.split("\n\n")[:3] == docx_text.split("\n\n")[:3]
+
+
+def test_ole_streams():
+    with open(SAMPLE_DOC, "rb") as fh:
+        ole = OleFile(fh)
+        assert {"WordDocument", "1Table", "Data"} <= set(ole.listdir())
+        assert struct.unpack_from("<H", ole.read_stream("WordDocument"))[0] == 0xA5EC
+
+
+def test_ole_rejects_other_files():
+    with pytest.raises(OleError):
+        OleFile(io.BytesIO(b"PK\x03\x04" + b"\x00" * 600))
+
+
+def test_sniff_type_by_content():
+    assert sniff_type(SAMPLE_XLS) == ".xls"
+    assert sniff_type(SAMPLE_DOC) == ".doc"
+    assert sniff_type(SAMPLE_DOCX) == ".docx"
+
+
+# --------------------------------------------------------------------
+# BIFF helpers
+# --------------------------------------------------------------------
+def test_decode_rk():
+    assert _decode_rk((100 << 2) | 0x02) == 100.0
+    assert _decode_rk((12345 << 2) | 0x03) == 123.45
+    assert _decode_rk(((-7) << 2 & 0xFFFFFFFF) | 0x02) == -7.0
+    assert _decode_rk(0x3FF80000) == 1.5
+
+
+def test_date_formats():
+    assert _is_date_format(14, {})
+    assert _is_date_format(200, {200: "yyyy-mm-dd"})
+    assert not _is_date_format(200, {200: '0.00" m"'})
+    assert not _is_date_format(0, {})
+    assert _format_number(43023, True, 0) == "2017-10-15"
+    assert _format_number(0.5, True, 1) == "1904-01-01 12:00:00"
+    assert _format_number(3.0, False, 0) == "3"
+    assert _format_number(2.25, False, 0) == "2.25"
+
+
+def test_unicode_string_across_continue():
+    # "Hello" starts compressed, the CONTINUE segment switches to UTF-16
+    first = struct.pack("<HB", 5, 0x00) + b"He"
+    second = b"\x01" + "llo".encode("utf-16-le")
+    assert _SegmentReader([first, second]).unicode_string() == "Hello"
+
+
+def test_segment_reader_truncated():
+    with pytest.raises(ValueError):
+        _SegmentReader([struct.pack("<HB", 5, 0x00) + b"He"]).unicode_string()
+
+
+# --------------------------------------------------------------------
+# Word97 text helpers / OfficeArt
+# --------------------------------------------------------------------
+def test_strip_fields_keeps_results():
+    text = "See \x13 HYPERLINK \"http://x\" \x14the site\x15 and \x13PAGE\x15done"
+    assert _strip_fields(text) == "See the site and done"
+
+
+def test_to_paragraphs_tables():
+    text = "Title\rA\x07B\x07\x07C\x07D\x07\x07\rEnd\x0bline\r"
+    assert _to_paragraphs(text) == ["Title", "A,B", "C,D", "End\nline"]
+
+
+def test_extract_blips_png():
+    # recVer 0 / recInstance 0x6E0 (one UID), recType 0xF01E, then UID + tag byte
+    body = b"\x11" * 16 + b"\xff" + PNG
+    record = struct.pack("<HHI", 0x6E0 << 4, 0xF01E, len(body)) + body
+    assert extract_blips(b"junk" + record + b"tail") == [("png", PNG)]
+
+
+def test_extract_blips_ignores_truncated():
+    body = b"\x11" * 16 + b"\xff" + PNG
+    record = struct.pack("<HHI", 0x6E0 << 4, 0xF01E, len(body) + 100) + body
+    assert extract_blips(record) == []
+
+
+# --------------------------------------------------------------------
+# Streaming DOCX
+# --------------------------------------------------------------------
+_DOC = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+            xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">
+<w:body>{}</w:body></w:document>"""
+
+
+def _p(text):
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _tc(text, props=""):
+    return f"<w:tc><w:tcPr>{props}</w:tcPr>{_p(text)}</w:tc>"
+
+
+def _blocks(body):
+    return list(_iter_blocks(io.BytesIO(_DOC.format(body).encode("utf-8"))))
+
+
+def test_docx_order_and_runs():
+    body = (
+        _p("First")
+        + "<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>"
+        + "<w:tbl><w:tr>" + _tc("x") + _tc("y") + "</w:tr></w:tbl>"
+        + _p("Last")
+    )
+    assert _blocks(body) == ["First", "a\tb\nc", "x,y", "Last"]
+
+
+def test_docx_merged_cells():
+    span = '<w:gridSpan w:val="2"/>'
+    restart = '<w:vMerge w:val="restart"/>'
+    cont = "<w:vMerge/>"
+    body = (
+        "<w:tbl>"
+        + "<w:tr>" + _tc("wide", span) + _tc("tall", restart) + "</w:tr>"
+        + "<w:tr>" + _tc("a") + _tc("b") + _tc("", cont) + "</w:tr>"
+        + "<w:tr>" + _tc("c") + _tc("d") + _tc("e") + "</w:tr>"
+        + "</w:tbl>"
+    )
+    assert _blocks(body) == ["wide,wide,tall", "a,b,tall", "c,d,e"]
+
+
+def test_docx_nested_table_and_fallback():
+    nested = "<w:tbl><w:tr>" + _tc("in1") + _tc("in2") + "</w:tr></w:tbl>"
+    body = (
+        "<w:tbl><w:tr><w:tc>" + _p("outer") + nested + "</w:tc>" + _tc("z") + "</w:tr></w:tbl>"
+        + "<w:p><w:r><mc:AlternateContent><mc:Choice><w:t>box</w:t></mc:Choice>"
+        + "<mc:Fallback><w:t>box</w:t></mc:Fallback></mc:AlternateContent></w:r></w:p>"
+    )
+    assert _blocks(body) == ["in1,in2", "outer,z", "box"]
+
+
+def test_docx_text_box_paragraph_in_fallback():
+    # Word writes text boxes as a DrawingML w:txbxContent in mc:Choice and a
+    # VML copy of the same w:p in mc:Fallback
+    box = "<w:txbxContent>" + _p("box") + "</w:txbxContent>"
+    body = (
+        "<w:p><w:r><w:t xml:space=\"preserve\">before </w:t></w:r>"
+        + "<w:r><mc:AlternateContent><mc:Choice>" + box + "</mc:Choice>"
+        + "<mc:Fallback><w:pict>" + box + "</w:pict></mc:Fallback></mc:AlternateContent></w:r>"
+        + "<w:r><w:t>after</w:t></w:r></w:p>"
+        + _p("next para")
+        + "<w:tbl><w:tr>" + _tc("c1") + _tc("c2") + "</w:tr></w:tbl>"
+    )
+    assert _blocks(body) == ["box", "before after", "next para", "c1,c2"]
+
+
+def test_parse_word_synthetic(tmp_path):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("word/document.xml", _DOC.format(_p("Hello") + _p("World")))
+        zf.writestr("word/media/image1.png", PNG)
+    text, images = parse_word(buf.getvalue(), "s", name="synthetic.docx")
+    assert text == "Hello\n\nWorld"
+    assert [os.path.basename(p) for p in images] == ["synthetic.docx_image1.png"]
@@ -0,0 +1,44 @@
+# tests/test_registry.py
+"""
+Parser registry: lazy built-ins and the plugin signatures it accepts.
+"""
+
+from stage_1_parsing.process_files import _parse, process_buffers
+from stage_1_parsing.registry import ParserRegistry, PARSERS, register_parser
+
+
+def test_builtins_registered():
+    assert {".pdf", ".docx", ".doc", ".xlsx", ".xls"} <= set(PARSERS)
+
+
+def test_two_argument_plugin(tmp_path):
+    seen = []
+
+    @register_parser(".tst2")
+    def parse_tst(file_path, session_id):
+        seen.append(file_path)
+        with open(file_path, encoding="utf-8") as fh:
+            return fh.read().upper(), []
+
+    path = tmp_path / "a.tst2"
+    path.write_text("from disk", encoding="utf-8")
+    assert _parse(str(path), "a.tst2", "s")["content"] == "FROM DISK"
+
+    # archive members / in-memory uploads are spilled to a temp file
+    record = _parse(b"from memory", "x/b.tst2", "s", name="x_b.tst2")
+    assert record["error"] is None and record["content"] == "FROM MEMORY"
+    assert seen[-1].endswith(".tst2")
+
+
+def test_name_aware_plugin_gets_buffer_and_name():
+    registry = ParserRegistry()
+    registry.register(".tst3", lambda source, session_id, name=None: (bytes(source).decode(), [name]))
+    assert registry.get(".tst3")(b"raw", "s", name="n.tst3") == ("raw", ["n.tst3"])
+
+
+def test_broken_lazy_target_fails_one_file(monkeypatch):
+    monkeypatch.setitem(PARSERS._targets, ".tstbad", "no_such_module:parse")
+    monkeypatch.setitem(PARSERS._targets, ".tstok", lambda source, session_id, name=None: ("ok", []))
+    df = process_buffers([("a.tstbad", b"x"), ("b.tstok", b"y")], "s")
+    assert df["error"].notna().tolist() == [True, False]
+    assert "no_such_module" in df.loc[0, "error"] and df.loc[1, "content"] == "ok"
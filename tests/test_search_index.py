@@ -0,0 +1,70 @@
+# tests/test_search_index.py
+"""
+SearchIndex: query escaping, per-page rows, re-indexing and session filtering.
+"""
+
+import pytest
+
+from stage_1_parsing.search_index import SearchIndex, _to_match_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SearchIndex(str(tmp_path / "search.db"))
+
+
+def _record(file_name, content, pages=None, error=None):
+    record = {"file_name": file_name, "file_type": ".pdf", "content": content, "error": error}
+    if pages is not None:
+        record["pages"] = pages
+    return record
+
+
+def test_match_query_escaping():
+    assert _to_match_query("hello world") == '"hello" "world"'
+    assert _to_match_query('say "hi"') == '"say" """hi"""'
+    assert _to_match_query("pars*") == '"pars"*'
+    assert _to_match_query("a OR b NOT c") == '"a" "OR" "b" "NOT" "c"'
+    assert _to_match_query("* ** ") == ""
+
+
+def test_operators_and_quotes_are_searched_as_text(index):
+    index.add("s1", _record("a.pdf", 'alpha OR "beta" (gamma) NEAR col:delta'))
+    index.flush()
+    assert [h["file_name"] for h in index.search('"beta" (gamma) col:delta')] == ["a.pdf"]
+    assert index.search("alpha OR missing") == []
+    assert index.search("***") == []
+
+
+def test_flush_waits_for_writes(index):
+    for i in range(50):
+        index.add("s1", _record(f"doc{i}.pdf", f"shared token{i}"))
+    index.flush()
+    assert len(index.search("shared", limit=100)) == 50
+    assert [h["file_name"] for h in index.search("tok*", limit=100)].count("doc7.pdf") == 1
+
+
+def test_pages_are_separate_rows(index):
+    index.add("s1", _record("report.pdf", "intro\nbudget", pages=["intro", "", "budget table"]))
+    index.flush()
+    hits = index.search("budget")
+    assert [(h["file_name"], h["page"]) for h in hits] == [("report.pdf", 3)]
+    assert "[budget]" in hits[0]["snippet"]
+    assert [h["page"] for h in index.search("intro")] == [1]
+
+
+def test_reparse_replaces_pages(index):
+    index.add("s1", _record("report.pdf", "old", pages=["old one", "old two"]))
+    index.add("s1", _record("report.pdf", "new", pages=["new text"]))
+    index.flush()
+    assert index.search("old") == []
+    assert [h["page"] for h in index.search("new")] == [1]
+
+
+def test_session_filter(index):
+    index.add("s1", _record("a.pdf", "invoice"))
+    index.add("s2", _record("a.pdf", "invoice"))
+    index.add("s2", _record("bad.pdf", "invoice", error="boom"))
+    index.flush()
+    assert {h["session_id"] for h in index.search("invoice")} == {"s1", "s2"}
+    assert [h["session_id"] for h in index.search("invoice", session_id="s2")] == ["s2"]